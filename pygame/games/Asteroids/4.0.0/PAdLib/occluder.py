@@ -1,55 +1,117 @@
 from .math_helpers import *
 
+import numpy as np
+
 class Occluder(object):
     def __init__(self, ccw_point_list):
-        self.points = list(ccw_point_list)
-        self.numof_points = len(self.points)
-        
-        self._padlib_lines = []
-        for i in range(self.numof_points):
-            self._padlib_lines.append([
-                self.points[ i                     ],
-                self.points[(i+1)%self.numof_points]
-            ])
-        self._padlib_normals = []
-        for l0,l1 in self._padlib_lines:
-            delta = vec_sub(l1,l0)
-            norm = [-delta[1],delta[0]]
-            self._padlib_normals.append(vec_norm(norm))
+        self.numof_points = len(ccw_point_list)
+
+        #The points as given, and the arrays set_transform writes into, so
+        #moving an occluder every frame doesn't build a new one.
+        self._padlib_local_points = np.array(ccw_point_list,dtype=float)
+        self.points = self._padlib_local_points.copy()
+        self._padlib_segments = np.empty((self.numof_points,2))
+        self._padlib_normals = np.empty((self.numof_points,2))
+        self._padlib_bounding_box = np.empty(4)
+        self._padlib_rotation = np.empty((2,2))
+        self._padlib_translation = np.empty(2)
+
+        self._padlib_update_segments()
+        self._padlib_local_normals = np.column_stack((-self._padlib_segments[:,1],self._padlib_segments[:,0]))
+        self._padlib_local_normals /= np.sqrt(np.sum(self._padlib_local_normals**2,axis=1))[:,np.newaxis]
+        self._padlib_normals[:] = self._padlib_local_normals
+        self._padlib_update_bounding_box()
         
         self.bounce = 1.0
         
     def set_bounce(self, bounce):
         self.bounce = bounce
 
+    #Moves the occluder to its given points rotated by angle_rad, scaled by
+    #scale and then moved by translation, in place.
+    def set_transform(self, angle_rad,translation, scale=1.0):
+        c,s = cos(angle_rad),sin(angle_rad)
+        rotation = self._padlib_rotation
+        rotation[0,0] = c; rotation[0,1] = s
+        rotation[1,0] = -s; rotation[1,1] = c
+        #rotation and uniform scale leave normals normalized, so just rotate them
+        np.dot(self._padlib_local_normals,rotation, out=self._padlib_normals)
+        rotation *= scale
+        np.dot(self._padlib_local_points,rotation, out=self.points)
+        self._padlib_translation[0] = translation[0]
+        self._padlib_translation[1] = translation[1]
+        self.points += self._padlib_translation
+
+        self._padlib_update_segments()
+        self._padlib_update_bounding_box()
+    def _padlib_update_segments(self):
+        np.subtract(self.points[1:],self.points[:-1], out=self._padlib_segments[:-1])
+        np.subtract(self.points[0],self.points[-1], out=self._padlib_segments[-1])
+    def _padlib_update_bounding_box(self):
+        np.min(self.points,axis=0, out=self._padlib_bounding_box[0:2])
+        np.max(self.points,axis=0, out=self._padlib_bounding_box[2:4])
+
+    #[x_min,y_min, x_max,y_max], kept up to date by set_transform
+    def get_bounding_box(self):
+        return self._padlib_bounding_box
+
     def intersects(self, point):
         #http://stackoverflow.com/questions/1119627/how-to-test-if-a-point-is-inside-of-a-convex-polygon-in-2d-integer-coordinates
-        sign = 0
-        for l0,l1 in self._padlib_lines:
-            affine_segment = vec_sub(l1,l0)
-            affine_point = vec_sub(point,l0)
-            
-            k = affine_segment[0]*affine_point[1] - affine_segment[1]*affine_point[0]
-            if k == 0.0: return False
-            if k > 0: k = 1
-            else: k = -1
-
-            if sign == 0: sign = k
-            elif k != sign: return False
-        return True
-    def _padlib_collide(self, particle):
-        if not self.intersects(particle.position): return
-        
-        projected_points = []
-        for l0,l1 in self._padlib_lines:
-            point = point_project_line(particle.position, l0,l1)
-            projected_points.append([vec_length_sq(vec_sub(point,particle.position)),point])
-        m = 99999999.0
-        for dist,point in projected_points:
-            if dist < m:
-                m = dist
-        for i in range(self.numof_points):
-            if projected_points[i][0] == m:
-                particle.position = projected_points[i][1]
-                particle.velocity = vec_reflect(vec_scale(-self.bounce,particle.velocity),self._padlib_normals[i])
-                return
+        x_min,y_min, x_max,y_max = self._padlib_bounding_box
+        if not (x_min <= point[0] <= x_max and y_min <= point[1] <= y_max): return False
+        segments = self._padlib_segments
+        k = segments[:,0]*(point[1]-self.points[:,1]) - segments[:,1]*(point[0]-self.points[:,0])
+        return bool(np.all(k > 0.0) or np.all(k < 0.0))
+    #(line starts, line deltas, normals), each an (n,2) array
+    def _padlib_get_arrays(self):
+        return self.points, self._padlib_segments, self._padlib_normals
+    #Pushes every particle inside the occluder out onto its nearest edge and
+    #bounces it off that edge.  positions and velocities are (n,2) arrays,
+    #changed in place.
+    def _padlib_collide(self, positions,velocities):
+        n = len(positions)
+        _padlib_collide_pairs([self],np.zeros(n,dtype=int),np.arange(n), positions,velocities)
+
+#Like Occluder._padlib_collide, for many occluders at once.  Particle
+#particle_indices[i] is tested against occluders[occluder_indices[i]].  A
+#particle inside more than one occluder is only pushed out of the first.
+def _padlib_collide_pairs(occluders,occluder_indices,particle_indices, positions,velocities):
+    if len(particle_indices) == 0: return
+
+    #Pad every occluder to the same number of lines by repeating its last one,
+    #which changes neither the inside test nor the nearest line.
+    numof_lines = max([occluder.numof_points for occluder in occluders])
+    l0 = np.empty((len(occluders),numof_lines,2))
+    segments = np.empty((len(occluders),numof_lines,2))
+    normals = np.empty((len(occluders),numof_lines,2))
+    bounce = np.empty(len(occluders))
+    for i,occluder in enumerate(occluders):
+        lines = np.minimum(np.arange(numof_lines),occluder.numof_points-1)
+        occluder_l0,occluder_segments,occluder_normals = occluder._padlib_get_arrays()
+        l0[i] = occluder_l0[lines]
+        segments[i] = occluder_segments[lines]
+        normals[i] = occluder_normals[lines]
+        bounce[i] = occluder.bounce
+
+    points = positions[particle_indices]
+    pair_l0 = l0[occluder_indices]
+    pair_segments = segments[occluder_indices]
+    affine_points = points[:,np.newaxis,:] - pair_l0
+    k = pair_segments[:,:,0]*affine_points[:,:,1] - pair_segments[:,:,1]*affine_points[:,:,0]
+    inside = np.flatnonzero(np.all(k > 0.0,axis=1) | np.all(k < 0.0,axis=1))
+    if len(inside) == 0: return
+    inside = inside[np.unique(particle_indices[inside],return_index=True)[1]]
+
+    pair_segments = pair_segments[inside]
+    t = np.sum(affine_points[inside]*pair_segments,axis=2) / np.sum(pair_segments*pair_segments,axis=2)
+    projected_points = pair_l0[inside] + t[:,:,np.newaxis]*pair_segments
+    dist = np.sum((projected_points - points[inside,np.newaxis,:])**2,axis=2)
+    nearest = np.argmin(dist,axis=1)
+
+    hits = np.arange(len(inside))
+    particles = particle_indices[inside]
+    positions[particles] = projected_points[hits,nearest]
+    velocity = -bounce[occluder_indices[inside],np.newaxis]*velocities[particles]
+    pair_normals = normals[occluder_indices[inside],nearest]
+    v_dot_n = np.sum(velocity*pair_normals,axis=1)
+    velocities[particles] = 2*v_dot_n[:,np.newaxis]*pair_normals - velocity
@@ -1,57 +1,14 @@
 from .math_helpers import *
+from .occluder import _padlib_collide_pairs
 
 import random
 
-class Particle(object):
-    def __init__(self, particle_system, position,velocity, life,colors):
-        self.particle_system = particle_system
-        
-        self.position = list(position)
-        self.velocity = list(velocity)
-
-        self.time = 0.0
-        self.life = life
+import numpy as np
+import pygame
 
-        self.colors = list(colors)
-        self._padlib_num_colors = len(self.colors)
-        self._padlib_color_needs_update = True
-        
-    def get_color(self):
-        if self._padlib_color_needs_update:
-            part = self.time / self.life
-            part *= self._padlib_num_colors
-            index = int(part)
-            if index >= self._padlib_num_colors:
-                index = self._padlib_num_colors - 1
-
-            color1 = self.colors[index]
-            if index + 1 >= self._padlib_num_colors:
-                color2 = color1
-            else:
-                color2 = self.colors[index+1]
+#Number of entries in each emitter's color table, from birth to death
+COLOR_TABLE_SIZE = 256
 
-            delta = [color2[i]-color1[i] for i in [0,1,2]]
-            
-            part = part - int(part)
-            self.color = [rndint(color1[i]+part*delta[i]) for i in [0,1,2]]
-            
-            self._padlib_color_needs_update = False
-
-        return self.color
-    
-    def update(self, dt, accel):
-        self.velocity[0] += accel[0]*dt
-        self.velocity[1] += accel[1]*dt
-        
-        self.position[0] += self.velocity[0]*dt
-        self.position[1] += self.velocity[1]*dt
-        
-        self.time += dt
-        self._padlib_color_needs_update = True
-        
-    def draw(self, surface):
-        surface.set_at( (rndint(self.position[0]),rndint(self.position[1])), self.get_color() )
-        
 class Emitter(object):
     def __init__(self):
         self.position = [0.0,0.0]
@@ -61,7 +18,9 @@ class Emitter(object):
         self.spread = 0.0 #in radians
         self.speed = [0.0,0.0] #in pixels / second
         self.life = [1.0,1.0] #in seconds
-        self.colors = [(255,255,255)]
+        self.set_particle_emit_colors([(255,255,255)])
+
+        self.particle_system = None #set by ParticleSystem.add_emitter
     
     def set_position(self, emitter_position):
         self.position = list(emitter_position)
@@ -77,59 +36,249 @@ class Emitter(object):
         self.speed = list(speed_range)
     def set_particle_emit_life(self, life_range):
         self.life = list(life_range)
+    #The colors are faded through evenly over each particle's life.  They are
+    #baked into a table of COLOR_TABLE_SIZE colors here, so particles only have
+    #to look their color up.
     def set_particle_emit_colors(self, colors):
         self.colors = list(colors)
 
+        stops = np.array([color[:3] for color in self.colors],dtype=float)
+        numof_colors = len(stops)
+        part = np.linspace(0.0,1.0,COLOR_TABLE_SIZE) * numof_colors
+        stop = part.astype(int)
+        part -= stop
+        stop = np.minimum(stop,numof_colors-1)
+        next_stop = np.minimum(stop+1,numof_colors-1)
+        colors = stops[stop] + part[:,np.newaxis]*(stops[next_stop]-stops[stop])
+        self.color_table = (colors+0.5).astype(np.uint8)
+
     #Function used to get a new random angle.  Can be overridden by user.
     def get_angle(self, center_rad,spread_rad):
         #Note that doesn't work nicely for omnidirectional sources
         #return center_rad + random.triangular(-0.5,0.5,0.0)*self.spread
         #Good, but too evenly spread in some cases
         return center_rad + (random.random()-0.5)*spread_rad
+    #Gets n new random angles at once.  Uses get_angle if that was overridden.
+    def get_angles(self, center_rad,spread_rad, n):
+        if type(self).get_angle is not Emitter.get_angle:
+            return np.array([self.get_angle(center_rad,spread_rad) for i in range(n)])
+        return center_rad + (np.random.random(n)-0.5)*spread_rad
+
+    #Emits n particles at once from position (default: the emitter's position).
+    #With dt, they are spread along their paths as if emitted over dt seconds.
+    def burst(self, n, position=None, dt=0.0):
+        if position is None: position = self.position
+        self._padlib_emit(self.particle_system, n, position, dt)
+
+    def _padlib_emit(self, parent, n, position, dt):
+        if n <= 0: return
+        angles = self.get_angles(self.angle,self.spread, n)
+        speeds = np.random.uniform(self.speed[0],self.speed[1], n)
+        velocities = speeds[:,np.newaxis] * np.column_stack((np.cos(angles),np.sin(angles)))
 
+        r = np.random.random(n) * dt
+        positions = np.add(position[:2], r[:,np.newaxis]*velocities)
+
+        lives = np.random.uniform(self.life[0],self.life[1], n)
+
+        parent._padlib_add(positions,velocities, lives,self.color_table)
     def _padlib_update(self, parent, dt):
-        for i in range(self.density):
-            if random.random() < dt:
-                angle = self.get_angle(self.angle,self.spread)
-                
-                speed = random.uniform(self.speed[0],self.speed[1])
-                vel = [speed*cos(angle),speed*sin(angle)]
-                
-                r = random.random() * dt
-                pos = [self.position[i] + r*vel[i] for i in [0,1]]
-                
-                life = random.uniform(self.life[0],self.life[1])
-                
-                parent.particles.append(Particle(parent, pos,vel, life,self.colors))
+        #density particles a second on average, the number emitted in any dt is
+        #Poisson distributed
+        self._padlib_emit(parent, np.random.poisson(self.density*dt), self.position, dt)
+
+#Broadphase for particle/occluder collision: a uniform grid of square cells,
+#each listing the occluders whose bounding boxes overlap it.  Occluders are
+#only moved between cells when the cells their bounding box covers change.
+class OccluderGrid(object):
+    def __init__(self, cell_size=32.0):
+        self.cell_size = float(cell_size)
+        self.cells = {} #cell key -> list of occluders
+        self._padlib_occluder_cells = {} #occluder -> range of cells it is in
+        self._padlib_keys = None #sorted keys of self.cells, None when changed
+
+    def _padlib_key(self, cell_x,cell_y):
+        #cell_y is less than 2**31 from 0 anywhere a particle can get
+        return (cell_x << 32) + cell_y
+    def _padlib_get_cells(self, occluder):
+        x_min,y_min, x_max,y_max = occluder.get_bounding_box()
+        return (
+            int(floor(x_min/self.cell_size)),int(floor(y_min/self.cell_size)),
+            int(floor(x_max/self.cell_size)),int(floor(y_max/self.cell_size))
+        )
+    def _padlib_place(self, occluder,cells,add):
+        x0,y0, x1,y1 = cells
+        for cell_x in range(x0,x1+1):
+            for cell_y in range(y0,y1+1):
+                key = self._padlib_key(cell_x,cell_y)
+                if add:
+                    self.cells.setdefault(key,[]).append(occluder)
+                else:
+                    self.cells[key].remove(occluder)
+                    if len(self.cells[key]) == 0: del self.cells[key]
+        self._padlib_keys = None
+
+    def update(self, occluders):
+        gone = set(self._padlib_occluder_cells)
+        for occluder in occluders:
+            gone.discard(occluder)
+            cells = self._padlib_get_cells(occluder)
+            old_cells = self._padlib_occluder_cells.get(occluder)
+            if cells == old_cells: continue
+            if old_cells is not None:
+                self._padlib_place(occluder,old_cells,False)
+            self._padlib_place(occluder,cells,True)
+            self._padlib_occluder_cells[occluder] = cells
+        for occluder in gone:
+            self._padlib_place(occluder,self._padlib_occluder_cells.pop(occluder),False)
 
+    #Returns (occluders, occluder_indices, point_indices): point
+    #point_indices[i] is in a cell overlapped by occluders[occluder_indices[i]]
+    def get_candidates(self, points):
+        if len(self.cells) == 0 or len(points) == 0:
+            return [], np.zeros(0,dtype=int), np.zeros(0,dtype=int)
+        if self._padlib_keys is None:
+            self._padlib_keys = np.array(sorted(self.cells),dtype=np.int64)
+
+        cells = np.floor(points/self.cell_size).astype(np.int64)
+        keys = (cells[:,0] << 32) + cells[:,1]
+        order = np.argsort(keys)
+        keys = keys[order]
+        starts = np.searchsorted(keys,self._padlib_keys,"left")
+        ends = np.searchsorted(keys,self._padlib_keys,"right")
+
+        occluders = []
+        occluder_numbers = {}
+        occluder_indices = []
+        point_indices = []
+        counts = []
+        for i in np.flatnonzero(ends > starts):
+            indices = order[starts[i]:ends[i]]
+            for occluder in self.cells[int(self._padlib_keys[i])]:
+                if occluder not in occluder_numbers:
+                    occluder_numbers[occluder] = len(occluders)
+                    occluders.append(occluder)
+                occluder_indices.append(occluder_numbers[occluder])
+                point_indices.append(indices)
+                counts.append(len(indices))
+        if len(occluders) == 0:
+            return [], np.zeros(0,dtype=int), np.zeros(0,dtype=int)
+        return occluders, np.repeat(occluder_indices,counts), np.concatenate(point_indices)
+
+#Particles are stored as a structure of arrays: row i of each array belongs
+#to the i-th live particle, so they can be moved, culled and drawn all at once.
 class ParticleSystem(object):
     def __init__(self):
-        self.particles = []
+        self.positions = np.zeros((0,2))
+        self.velocities = np.zeros((0,2))
+        self.ages = np.zeros(0)
+        self.lives = np.zeros(0)
+        self.color_indices = np.zeros(0,dtype=int) #into self.color_tables
+
+        self.color_tables = [] #the emitters' color tables the particles came from
+        self._padlib_color_table_indices = {}
+        self._padlib_color_table = np.zeros((0,3),dtype=np.uint8) #color_tables, stacked
+        self._padlib_new = [] #particles emitted since the last update
+        
         self.emitters = {}
         
         self.accel = [0.0,0.0]
         self.occluders = []
+        self.occluder_grid = OccluderGrid()
+
+    def __len__(self):
+        return len(self.ages)
         
     def add_emitter(self, emitter,name=-1):
         if name == -1: name = "_padlib_"+str(hash(emitter))
         self.emitters[name] = emitter
+        emitter.particle_system = self
 
     def set_particle_acceleration(self, acceleration):
         self.accel = list(acceleration)
+    #Call again whenever the occluders move; only the ones whose bounding boxes
+    #changed cells are moved in the grid.
     def set_particle_occluders(self, occluders):
         self.occluders = list(occluders)
+        self.occluder_grid.update(self.occluders)
+
+    def _padlib_get_color_table(self, color_table):
+        #self.color_tables keeps the table alive, so its id can't be reused
+        key = id(color_table)
+        if key not in self._padlib_color_table_indices:
+            #A new table takes the slot of one no particle uses anymore, so
+            #emitters that change colors don't grow the tables forever.
+            used = np.bincount(self.color_indices,minlength=len(self.color_tables)) > 0
+            for positions,velocities,lives,color_index in self._padlib_new:
+                used[color_index] = True
+            free = np.flatnonzero(~used)
+            if len(free) > 0:
+                index = int(free[0])
+                del self._padlib_color_table_indices[id(self.color_tables[index])]
+                self.color_tables[index] = color_table
+                self._padlib_color_table[index*COLOR_TABLE_SIZE:(index+1)*COLOR_TABLE_SIZE] = color_table
+            else:
+                index = len(self.color_tables)
+                self.color_tables.append(color_table)
+                self._padlib_color_table = np.concatenate(self.color_tables)
+            self._padlib_color_table_indices[key] = index
+        return self._padlib_color_table_indices[key]
+    def _padlib_add(self, positions,velocities, lives,color_table):
+        color_index = self._padlib_get_color_table(color_table)
+        self._padlib_new.append((positions,velocities, lives,color_index))
+    def _padlib_add_new(self):
+        if len(self._padlib_new) == 0: return
+        new = self._padlib_new
+        self._padlib_new = []
+        self.positions = np.concatenate([self.positions] + [positions for positions,velocities,lives,color_index in new])
+        self.velocities = np.concatenate([self.velocities] + [velocities for positions,velocities,lives,color_index in new])
+        self.lives = np.concatenate([self.lives] + [lives for positions,velocities,lives,color_index in new])
+        self.color_indices = np.concatenate([self.color_indices] + [np.full(len(lives),color_index) for positions,velocities,lives,color_index in new])
+        self.ages = np.concatenate((self.ages,np.zeros(len(self.lives)-len(self.ages))))
         
     def update(self, dt):
         for emitter in self.emitters.values():
             emitter._padlib_update(self,dt)
+        self._padlib_add_new()
             
-        for particle in self.particles:
-            particle.update(dt,self.accel)
-            if particle.time > particle.life:
-                self.particles.remove(particle)
-                continue
-            for occluder in self.occluders:
-                occluder._padlib_collide(particle)
+        self.velocities += np.multiply(self.accel,dt)
+        self.positions += self.velocities*dt
+        self.ages += dt
+
+        alive = self.ages <= self.lives
+        if not alive.all():
+            self.positions = self.positions[alive]
+            self.velocities = self.velocities[alive]
+            self.ages = self.ages[alive]
+            self.lives = self.lives[alive]
+            self.color_indices = self.color_indices[alive]
+
+        #only particles near an occluder are tested against it
+        occluders,occluder_indices,particle_indices = self.occluder_grid.get_candidates(self.positions)
+        _padlib_collide_pairs(occluders,occluder_indices,particle_indices, self.positions,self.velocities)
+
+    #Each particle's color, looked up in its emitter's color table by age
+    def get_colors(self):
+        index = (self.ages/self.lives*(COLOR_TABLE_SIZE-1) + 0.5).astype(int)
+        index = np.minimum(index,COLOR_TABLE_SIZE-1)
+        return self._padlib_color_table[self.color_indices*COLOR_TABLE_SIZE + index]
     def draw(self, surface):
-        for particle in self.particles:
-            particle.draw(surface)
+        if len(self) == 0: return
+        colors = self.get_colors()
+        x = (self.positions[:,0]+0.5).astype(int)
+        y = (self.positions[:,1]+0.5).astype(int)
+        clip = surface.get_clip()
+        visible = (x >= clip.left) & (x < clip.right) & (y >= clip.top) & (y < clip.bottom)
+        x,y,colors = x[visible],y[visible],colors[visible]
+
+        if surface.get_bytesize() in (3,4):
+            pixels = pygame.surfarray.pixels3d(surface)
+            pixels[x,y] = colors
+            del pixels
+            if surface.get_flags() & pygame.SRCALPHA:
+                alpha = pygame.surfarray.pixels_alpha(surface)
+                alpha[x,y] = 255
+                del alpha
+        else:
+            for i in range(len(x)):
+                surface.set_at((x[i],y[i]),colors[i])
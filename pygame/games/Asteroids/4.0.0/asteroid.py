@@ -28,6 +28,12 @@ class Asteroid:
             point.append(  cos(angle)  )
             point.append(  sin(angle)  )
             self.rel_points.append(point)
+
+        #Moved in place every update, and its points are the ones drawn
+        self.occluder = occluder.Occluder(self.rel_points)
+        self.occluder.set_bounce(0.1)
+        self.occluder.set_transform(radians(self.angle),self.position,self.radius)
+        self.real_points = self.occluder.points
         
 ##    def pointtest(self,point):
 ##        x = point[0]
@@ -84,17 +90,7 @@ class Asteroid:
 
         self.angle = (self.angle+self.spin) % 360.0
 
-        self.real_points = []
-        angle_rad = radians(self.angle)
-        for x,y in self.rel_points:
-            rotated = rotate_point([self.radius*x,self.radius*y],angle_rad)
-            self.real_points.append([
-                rotated[0] + self.position[0],
-                rotated[1] + self.position[1]
-            ])
-
-        self.occluder = occluder.Occluder(self.real_points)
-        self.occluder.set_bounce(0.1)
+        self.occluder.set_transform(radians(self.angle),self.position,self.radius)
             
     def draw(self, surface):
         pygame.draw.aalines(surface,(255,255,255),True,self.real_points)
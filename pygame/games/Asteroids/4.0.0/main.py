@@ -210,7 +210,7 @@ def update(dt):
     player1.collide_asteroids(asteroids, particle_system)
 
     emitter_rocket.set_position(player1.position)
-##    particle_system.set_particle_occluders([asteroid.occluder for asteroid in asteroids])
+    particle_system.set_particle_occluders([asteroid.occluder for asteroid in asteroids])
     particle_system.update(dt)
 
     if level_text_brightness > 0.0:
@@ -102,22 +102,14 @@ class Player:
         for bullet in self.bullets:
             for asteroid in asteroids:
                 if asteroid.occluder.intersects(bullet.position):
-                    emitter = particle_system.emitters["hit"]
-                    emitter.set_position(bullet.position)
-                    emitter.set_particle_emit_density(100)
-                    emitter._padlib_update(particle_system,dt)
-                    emitter.set_particle_emit_density(0)
+                    particle_system.emitters["hit"].burst(2, bullet.position, dt)
                         
                     asteroid.hit()
                     
                     self.score += 10
                     
                     if asteroid.health == 0:
-                        emitter = particle_system.emitters["shock"]
-                        emitter.set_position(asteroid.position)
-                        emitter.set_particle_emit_density(1000)
-                        emitter._padlib_update(particle_system,dt)
-                        emitter.set_particle_emit_density(0)
+                        particle_system.emitters["shock"].burst(16, asteroid.position, dt)
                     
                         asteroids.remove(asteroid)
                         self.score += 100
@@ -138,10 +130,7 @@ class Player:
                     particle_system.emitters["turn1"].set_particle_emit_density(0)
                     particle_system.emitters["turn2"].set_particle_emit_density(0)
                     
-                    particle_system.emitters["die"].set_position(self.position)
-                    particle_system.emitters["die"].set_particle_emit_density(1000)
-                    particle_system.emitters["die"]._padlib_update(particle_system,0.1)
-                    particle_system.emitters["die"].set_particle_emit_density(0)
+                    particle_system.emitters["die"].burst(100, self.position, 0.1)
                     
                     self.dying = 1.0
                     self.alive = False
@@ -1,4 +1,6 @@
+import atexit
 import os
+import threading
 
 
 class Score:
@@ -7,55 +9,70 @@ class Score:
         self.file = file
         self.maxscore = self.load_maxscore()
 
-    def file_is_empty(self) -> bool:
-        "Returns True if there is nothing in the file -> writes 10"
-        with open(self.file, "r") as file_check:
-            f = file_check.read()
-        if f == "":
-            return True
-        else:
-            return False
+        # The file is written by a background thread so that saving a score
+        # never makes a frame wait for the disk. Only the latest score that
+        # is waiting to be written is kept, older ones are skipped.
+        self.pending = None
+        self.closed = False
+        self.condition = threading.Condition()
+        self.writer = threading.Thread(target=self._writer, name="score-writer", daemon=True)
+        self.writer.start()
+        atexit.register(self.close)
 
     def save_score(self, score):
         "Saves the score if it's greater than the previous maxscore"
         print(score, self.maxscore)
         if int(score) >= int(self.maxscore):
-            self.write_maxscore(str(score))
+            self.maxscore = score
+            with self.condition:
+                self.pending = str(score)
+                self.condition.notify()
 
     def write_maxscore(self, score: int):
-        "Write in the score.txt file if it does not exists"
-        with open(self.file, "w") as file:
+        "Write in the score.txt file, to a temporary file first so it's never half written"
+        tmp = self.file + ".tmp"
+        with open(tmp, "w") as file:
             file.write(str(score))
-            self.maxscore = score
-
-    def read_maxscore(self):
-        "if the file exists and is not empty reads it and returns the score"
-        with open(self.file, "r") as file_saved:
-            last_maxscore = int(file_saved.read())
-            print("Maxscore = " + str(last_maxscore))
-            return last_maxscore
-
-    def file_exists(self) -> True:
-        "Check if file exists in the folder"
-        if self.file in os.listdir():
-            return True
-        else:
-            return False
-
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp, self.file)
 
     def load_maxscore(self) -> int:
         "If there is a file with a maxscore it returns it\
         so that it will be in self.maxscore,\
         otherwise it will create a new file with a maxscore of 10\
         and will return this 10"
-        if self.file_exists():
-            if not self.file_is_empty():
-                # This reads the score and put in Puuzzle.maxscore
-                maxscore = int(self.read_maxscore())
-                return maxscore
-            else:
-                self.write_maxscore("1")
-                return 3
+        try:
+            with open(self.file, "r") as file_saved:
+                saved = file_saved.read()
+        except FileNotFoundError:
+            saved = ""
+        if saved != "":
+            # This reads the score and put in Puuzzle.maxscore
+            maxscore = int(saved)
+            print("Maxscore = " + str(maxscore))
+            return maxscore
         else:
             self.write_maxscore("1")
-            return 3
\ No newline at end of file
+            return 3
+
+    def _writer(self):
+        "Runs in the background, writes the latest saved score until closed"
+        while True:
+            with self.condition:
+                while self.pending is None and not self.closed:
+                    self.condition.wait()
+                if self.pending is None:
+                    return
+                score, self.pending = self.pending, None
+            try:
+                self.write_maxscore(score)
+            except OSError as e:
+                print("Could not save the maxscore: " + str(e))
+
+    def close(self):
+        "Writes the score that is still waiting, if any, and stops the writer"
+        with self.condition:
+            self.closed = True
+            self.condition.notify()
+        self.writer.join()
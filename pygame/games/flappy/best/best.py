@@ -60,6 +60,12 @@ class Bird(pygame.sprite.Sprite):
 		for num in range (1, 4):
 			img = pygame.image.load(f"img/bird{num}.png")
 			self.images.append(img)
+		#every rotation the bird is drawn at, so nothing is rotated while playing
+		self.rotated = []
+		for img in self.images:
+			angles = {angle: pygame.transform.rotate(img, angle) for angle in range(-16, 21)}
+			angles[-90] = pygame.transform.rotate(img, -90)
+			self.rotated.append(angles)
 		self.image = self.images[self.index]
 		self.rect = self.image.get_rect()
 		self.rect.center = [x, y]
@@ -97,10 +103,10 @@ class Bird(pygame.sprite.Sprite):
 
 
 			#rotate the bird
-			self.image = pygame.transform.rotate(self.images[self.index], self.vel * -2)
+			self.image = self.rotated[self.index][int(self.vel * -2)]
 		else:
 			#point the bird at the ground
-			self.image = pygame.transform.rotate(self.images[self.index], -90)
+			self.image = self.rotated[self.index][-90]
 
 
 
@@ -0,0 +1,318 @@
+"""
+Struct of arrays version of the flappy bird simulation. Instead of
+one Bird object per genome, BirdBatch keeps the state of the whole
+population in NumPy arrays and steps every bird at once. The physics
+and the pixel perfect collision give exactly the same results as
+Bird and Pipe.collide in flappy_bird.py, and NetworkBatch activates
+a whole generation of networks in one vectorized pass.
+"""
+import numpy as np
+
+# NumPy versions of neat's built-in activation functions, with the same
+# clamping. Other activation functions are called one value at a time
+VECTORIZED = {
+    "sigmoid_activation": lambda z: 1.0 / (1.0 + np.exp(-np.clip(5.0 * z, -60.0, 60.0))),
+    "tanh_activation": lambda z: np.tanh(np.clip(2.5 * z, -60.0, 60.0)),
+    "sin_activation": lambda z: np.sin(np.clip(5.0 * z, -60.0, 60.0)),
+    "gauss_activation": lambda z: np.exp(-5.0 * np.clip(z, -3.4, 3.4)**2),
+    "relu_activation": lambda z: np.where(z > 0.0, z, 0.0),
+    "identity_activation": lambda z: z,
+    "clamped_activation": lambda z: np.clip(z, -1.0, 1.0),
+    "abs_activation": np.abs,
+    "hat_activation": lambda z: np.maximum(0.0, 1 - np.abs(z)),
+    "square_activation": lambda z: z ** 2,
+    "cube_activation": lambda z: z ** 3,
+}
+
+
+def mask_to_array(mask):
+    """
+    copy a pygame mask into a boolean array
+    :param mask: pygame.mask.Mask
+    :return: numpy array indexed [row, column]
+    """
+    width, height = mask.get_size()
+    return np.array([[mask.get_at((x, y)) for x in range(width)] for y in range(height)], dtype=bool)
+
+
+def column_spans(pixels):
+    """
+    find the first and last solid row of every column of a sprite.
+    Each column has to be one solid run of pixels (true for the pipe)
+    :param pixels: boolean array from mask_to_array
+    :return: (first, last) arrays, empty columns have first > last
+    """
+    solid = pixels.any(axis=0)
+    first = np.where(solid, pixels.argmax(axis=0), 1)
+    last = np.where(solid, pixels.shape[0] - 1 - pixels[::-1].argmax(axis=0), 0)
+    if not np.array_equal(pixels.sum(axis=0), np.maximum(last - first + 1, 0)):
+        raise ValueError("every column of the sprite must be a single solid run")
+    return first, last
+
+
+class BirdBatch:
+    """
+    the alive birds of a population stored as arrays, one row per
+    bird. Dead birds are dropped with keep, so every step only works
+    on the birds still flying, and ids maps each row back to the bird's
+    index in the population. The constants match Bird in flappy_bird.py
+    """
+    MAX_ROTATION = 25
+    ROT_VEL = 20
+    ANIMATION_TIME = 5
+    JUMP_VEL = -10.5
+
+    # animation frame shown for every img_count, 0 is where it loops
+    # back to after 20
+    FRAME_SEQUENCE = np.repeat([0, 0, 1, 2, 1], [1, 5, 5, 5, 5])
+
+    def __init__(self, n, x, y, frames):
+        """
+        Initialize the population
+        :param n: number of birds (int)
+        :param x: x pos of every bird (int)
+        :param y: starting y pos of every bird (int)
+        :param frames: animation frames as arrays from mask_to_array
+        :return: None
+        """
+        self.x = x
+        self.y = np.full(n, y, dtype=float)
+        self.tilt = np.zeros(n, dtype=int)
+        self.tick_count = np.zeros(n, dtype=int)
+        self.vel = np.zeros(n)
+        self.height = self.y.copy()
+        self.img_count = np.zeros(n, dtype=int)
+        self.frame = np.zeros(n, dtype=int)
+        self.ids = np.arange(n)
+
+        self.img_height, self.img_width = frames[0].shape
+        # solid[f, c, r] is the number of solid pixels above row r in
+        # column c of frame f, so any span of a column can be tested
+        # for overlap with two lookups
+        self.solid = np.zeros((len(frames), self.img_width, self.img_height + 1), dtype=int)
+        self.solid[:, :, 1:] = np.cumsum(np.stack(frames).transpose(0, 2, 1), axis=2)
+
+    def __len__(self):
+        return len(self.y)
+
+    def keep(self, which):
+        """
+        drop every bird that isn't selected, the rest keep their order
+        :param which: boolean mask over the rows
+        :return: None
+        """
+        self.y = self.y[which]
+        self.tilt = self.tilt[which]
+        self.tick_count = self.tick_count[which]
+        self.vel = self.vel[which]
+        self.height = self.height[which]
+        self.img_count = self.img_count[which]
+        self.frame = self.frame[which]
+        self.ids = self.ids[which]
+
+    def jump(self, which):
+        """
+        make the selected birds jump
+        :param which: boolean mask or index array over the rows
+        :return: None
+        """
+        self.vel[which] = self.JUMP_VEL
+        self.tick_count[which] = 0
+        self.height[which] = self.y[which]
+
+    def move(self):
+        """
+        move every bird, same physics as Bird.move
+        :return: None
+        """
+        self.tick_count += 1
+
+        displacement = self.vel*self.tick_count + 0.5*(3)*self.tick_count**2
+
+        # terminal velocity
+        np.minimum(displacement, 16, out=displacement)
+        up = displacement < 0
+        np.subtract(displacement, 2, out=displacement, where=up)
+
+        self.y += displacement
+
+        # updated in place, a few small ufuncs cost less than np.where
+        # when only a handful of birds are left
+        up |= self.y < self.height + 50
+        np.subtract(self.tilt, self.ROT_VEL, out=self.tilt, where=~up & (self.tilt > -90))
+        np.maximum(self.tilt, self.MAX_ROTATION, out=self.tilt, where=up)
+
+    def animate(self):
+        """
+        advance the flapping animation, same as Bird.animate
+        :return: None
+        """
+        self.img_count += 1
+        self.img_count %= self.ANIMATION_TIME*4 + 1
+        self.frame = self.FRAME_SEQUENCE[self.img_count]
+
+        # so when bird is nose diving it isn't flapping
+        diving = self.tilt <= -80
+        np.copyto(self.frame, 1, where=diving)
+        np.copyto(self.img_count, self.ANIMATION_TIME*2, where=diving)
+
+    def inputs(self, top, bottom):
+        """
+        network inputs of every bird for the pipe they are flying at
+        :param top: height of the gap's top edge (int)
+        :param bottom: height of the gap's bottom edge (int)
+        :return: (rows, 3) array of bird y, distance to top and to bottom
+        """
+        return np.column_stack((self.y, np.abs(self.y - top), np.abs(self.y - bottom)))
+
+    def collide(self, x, y, spans):
+        """
+        pixel perfect test of every bird against one sprite,
+        same result as overlapping the bird's mask with the sprite's
+        :param x: x pos of the sprite (int)
+        :param y: y pos of the sprite (int)
+        :param spans: (first, last) arrays from column_spans
+        :return: boolean mask over the rows of the birds that hit the sprite
+        """
+        first, last = spans
+        left = max(self.x, x)
+        right = min(self.x + self.img_width, x + len(first))
+        if left >= right:
+            return np.zeros(len(self), dtype=bool)
+
+        columns = np.arange(left, right)
+        bird_columns = columns - self.x
+        sprite_columns = columns - x
+
+        # the rows of each sprite column, relative to each bird
+        bird_y = np.rint(self.y).astype(int)[:, None]
+        start = np.minimum(np.maximum(y + first[sprite_columns] - bird_y, 0), self.img_height)
+        end = np.minimum(np.maximum(y + last[sprite_columns] + 1 - bird_y, 0), self.img_height)
+
+        frame = self.frame[:, None]
+        overlap = self.solid[frame, bird_columns, end] - self.solid[frame, bird_columns, start]
+        return (overlap > 0).any(axis=1)
+
+
+class NetworkBatch:
+    """
+    a generation of neat-python feed forward networks compiled into
+    padded arrays, so every network can be activated in one pass.
+    Node k of every network is evaluated at the same time with NumPy.
+
+    The outputs are not bit for bit the same as
+    FeedForwardNetwork.activate: NumPy sums the weighted inputs in a
+    different order than sum() (which also changed to compensated
+    summation in Python 3.12), and np.tanh/np.exp can differ from
+    math's in the last bit. They agree to within about 1e-15 (relative
+    to outputs bigger than 1), so a bird only jumps differently if its
+    output is that close to 0.5. On Python 3.11 and older, where sum()
+    adds left to right, the fitness of every bird was the same as with
+    the object simulation in every test game.
+    """
+
+    def __init__(self, nets):
+        """
+        Compile the networks
+        :param nets: list of neat.nn.FeedForwardNetwork
+        :return: None
+        """
+        n_inputs = len(nets[0].input_nodes)
+        n_nodes = max(len(net.node_evals) for net in nets)
+        n_links = max([len(links) for net in nets for node, act, agg, bias, response, links in net.node_evals] + [1])
+
+        # value slots of every network: the inputs, then one for each
+        # node in evaluation order, then one that is always 0 for
+        # padding and for outputs that nothing connects to
+        self.zero = n_inputs + n_nodes
+        self.n_inputs = n_inputs
+        self.bias = np.zeros((len(nets), n_nodes))
+        self.response = np.zeros((len(nets), n_nodes))
+        self.source = np.full((len(nets), n_nodes, n_links), self.zero)
+        self.weight = np.zeros((len(nets), n_nodes, n_links))
+        self.outputs = np.full((len(nets), len(nets[0].output_nodes)), self.zero)
+
+        # the activation function of every node, -1 for padding
+        functions = []
+        self.activation = np.full((len(nets), n_nodes), -1)
+
+        for n, net in enumerate(nets):
+            if len(net.input_nodes) != n_inputs:
+                raise ValueError("all networks must have the same number of inputs")
+            slots = dict((key, i) for i, key in enumerate(net.input_nodes))
+            for k, (node, act_func, agg_func, bias, response, links) in enumerate(net.node_evals):
+                if agg_func.__name__ != "sum_aggregation":
+                    raise ValueError("only sum aggregation can be compiled, got {}".format(agg_func.__name__))
+                if act_func not in functions:
+                    functions.append(act_func)
+                self.activation[n, k] = functions.index(act_func)
+                self.bias[n, k] = bias
+                self.response[n, k] = response
+                for l, (i, w) in enumerate(links):
+                    self.source[n, k, l] = slots[i]
+                    self.weight[n, k, l] = w
+                slots[node] = n_inputs + k
+            for o, key in enumerate(net.output_nodes):
+                self.outputs[n, o] = slots.get(key, self.zero)
+
+        self.functions = [VECTORIZED.get(f.__name__) or self._elementwise(f) for f in functions]
+        self._index()
+
+    @staticmethod
+    def _elementwise(function):
+        """
+        a custom activation function applied one value at a time
+        :return: function of a float array
+        """
+        ufunc = np.frompyfunc(function, 1, 1)
+        return lambda z: ufunc(z).astype(float)
+
+    def _index(self):
+        """
+        turn the value slots into indices into the flattened values of
+        every network, so activate can gather them in one take
+        :return: None
+        """
+        offsets = np.arange(len(self))[:, None] * (self.zero + 1)
+        self.flat_source = self.source + offsets[:, :, None]
+        self.flat_outputs = self.outputs + offsets
+
+    def __len__(self):
+        return len(self.bias)
+
+    def keep(self, which):
+        """
+        drop every network that isn't selected, the rest keep their order
+        :param which: boolean mask or index array
+        :return: None
+        """
+        self.bias = self.bias[which]
+        self.response = self.response[which]
+        self.source = self.source[which]
+        self.weight = self.weight[which]
+        self.outputs = self.outputs[which]
+        self.activation = self.activation[which]
+        self._index()
+
+    def activate(self, inputs):
+        """
+        activate the networks
+        :param inputs: (n, inputs) array, one row per network
+        :return: (n, outputs) array
+        """
+        values = np.zeros((len(self), self.zero + 1))
+        values[:, :self.n_inputs] = inputs
+        flat = values.reshape(-1)
+
+        for k in range(self.source.shape[1]):
+            s = np.einsum('ij,ij->i', flat[self.flat_source[:, k]], self.weight[:, k])
+            z = self.bias[:, k] + self.response[:, k] * s
+            if len(self.functions) == 1:
+                # padding nodes are never read, so they can be activated too
+                values[:, self.n_inputs + k] = self.functions[0](z)
+                continue
+            for f, function in enumerate(self.functions):
+                nodes = self.activation[:, k] == f
+                values[nodes, self.n_inputs + k] = function(z[nodes])
+
+        return flat[self.flat_outputs]
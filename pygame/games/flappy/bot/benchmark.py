@@ -0,0 +1,288 @@
+"""
+Measures how fast the flappy bird bot trains. Plays the same game as
+eval_genomes for fixed seeds and population sizes, once with a Bird
+object per genome and once with the vectorized BirdBatch, and reports
+frames per second, bird frames per second, where the time goes and
+how much memory each bird takes.
+
+    python benchmark.py --sizes 50 500 5000 --output bench.json
+"""
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")  # drawing is timed without a real window
+
+import argparse
+import json
+import platform
+import random
+import time
+import tracemalloc
+
+import neat
+import numpy as np
+
+import flappy_bird as fb
+from batch import BirdBatch, NetworkBatch
+from course import Course
+
+PHASES = ("physics", "activation", "collision", "drawing")
+
+
+def make_genomes(config, size, seed):
+    """
+    a fresh population of the given size, the same for the same seed
+    :return: list of (genome_id, genome) tuples
+    """
+    random.seed(seed)
+    config.pop_size = size
+    return list(neat.Population(config).population.items())
+
+
+def bench_objects(genomes, config, course, draw=False):
+    """
+    the game loop of flappy_bird.play with a timer around every phase
+    :return: (fitness list, seconds per phase, frames, bird frames)
+    """
+    timings = dict.fromkeys(PHASES, 0.0)
+    win = fb.open_window() if draw else None
+    nets = [neat.nn.FeedForwardNetwork.create(genome, config) for genome_id, genome in genomes]
+    birds = [fb.Bird(230, 350) for net in nets]
+    ids = list(range(len(nets)))
+    fitness = [0] * len(nets)
+
+    base = fb.Base(fb.FLOOR)
+    pipes = [fb.Pipe(700, course[0])]
+    score = 0
+    frames = bird_frames = 0
+
+    while len(birds) > 0 and score < fb.MAX_SCORE:
+        frames += 1
+        bird_frames += len(birds)
+        pipe_ind = 0
+        if len(pipes) > 1 and birds[0].x > pipes[0].x + pipes[0].PIPE_TOP.get_width():
+            pipe_ind = 1
+
+        t = time.perf_counter()
+        for x, bird in enumerate(birds):
+            fitness[ids[x]] += 0.1
+            bird.move()
+        base.move()
+        for pipe in pipes:
+            pipe.move()
+        timings["physics"] += time.perf_counter() - t
+
+        t = time.perf_counter()
+        pipe = pipes[pipe_ind]
+        for x, bird in enumerate(birds):
+            if nets[ids[x]].activate((bird.y, abs(bird.y - pipe.height), abs(bird.y - pipe.bottom)))[0] > 0.5:
+                bird.jump()
+        timings["activation"] += time.perf_counter() - t
+
+        t = time.perf_counter()
+        rem = []
+        add_pipe = False
+        for pipe in pipes:
+            for bird in birds[:]:
+                if pipe.collide(bird, win):
+                    fitness[ids[birds.index(bird)]] -= 1
+                    ids.pop(birds.index(bird))
+                    birds.pop(birds.index(bird))
+
+            if pipe.x + pipe.PIPE_TOP.get_width() < 0:
+                rem.append(pipe)
+
+            if not pipe.passed and pipe.x < 230:
+                pipe.passed = True
+                add_pipe = True
+        timings["collision"] += time.perf_counter() - t
+
+        t = time.perf_counter()
+        if add_pipe:
+            score += 1
+            for x in ids:
+                fitness[x] += 5
+            pipes.append(fb.Pipe(fb.WIN_WIDTH, course[score]))
+
+        for r in rem:
+            pipes.remove(r)
+
+        for bird in birds[:]:
+            if bird.y + bird.img.get_height() - 10 >= fb.FLOOR or bird.y < -50:
+                ids.pop(birds.index(bird))
+                birds.pop(birds.index(bird))
+
+        for bird in birds:
+            bird.animate()
+        timings["physics"] += time.perf_counter() - t
+
+        if draw:
+            t = time.perf_counter()
+            fb.draw_window(win, birds, pipes, base, score, 1, pipe_ind)
+            timings["drawing"] += time.perf_counter() - t
+
+    return fitness, timings, frames, bird_frames
+
+
+def bench_batch(genomes, config, course):
+    """
+    the game loop of flappy_bird.simulate_batch with a timer around
+    every phase. There is nothing to draw
+    :return: (fitness list, seconds per phase, frames, bird frames)
+    """
+    timings = dict.fromkeys(PHASES, 0.0)
+    nets = NetworkBatch([neat.nn.FeedForwardNetwork.create(genome, config) for genome_id, genome in genomes])
+    birds = BirdBatch(len(nets), 230, 350, fb.BIRD_FRAMES)
+    fitness = np.zeros(len(nets))
+
+    pipes = [fb.Pipe(700, course[0])]
+    score = 0
+    frames = bird_frames = 0
+
+    while len(birds) > 0 and score < fb.MAX_SCORE:
+        frames += 1
+        bird_frames += len(birds)
+        pipe_ind = 0
+        if len(pipes) > 1 and birds.x > pipes[0].x + pipes[0].PIPE_TOP.get_width():
+            pipe_ind = 1
+
+        t = time.perf_counter()
+        fitness[birds.ids] += 0.1
+        birds.move()
+        for pipe in pipes:
+            pipe.move()
+        timings["physics"] += time.perf_counter() - t
+
+        t = time.perf_counter()
+        inputs = birds.inputs(pipes[pipe_ind].height, pipes[pipe_ind].bottom)
+        birds.jump(nets.activate(inputs)[:, 0] > 0.5)
+        timings["activation"] += time.perf_counter() - t
+
+        t = time.perf_counter()
+        rem = []
+        add_pipe = False
+        for pipe in pipes:
+            hit = birds.collide(pipe.x, pipe.top, fb.PIPE_TOP_SPANS) | birds.collide(pipe.x, pipe.bottom, fb.PIPE_BOTTOM_SPANS)
+            if hit.any():
+                fitness[birds.ids[hit]] -= 1
+                nets.keep(~hit)
+                birds.keep(~hit)
+
+            if pipe.x + pipe.PIPE_TOP.get_width() < 0:
+                rem.append(pipe)
+
+            if not pipe.passed and pipe.x < birds.x:
+                pipe.passed = True
+                add_pipe = True
+        timings["collision"] += time.perf_counter() - t
+
+        t = time.perf_counter()
+        if add_pipe:
+            score += 1
+            fitness[birds.ids] += 5
+            pipes.append(fb.Pipe(fb.WIN_WIDTH, course[score]))
+
+        for r in rem:
+            pipes.remove(r)
+
+        inside = (birds.y + birds.img_height - 10 < fb.FLOOR) & (birds.y >= -50)
+        if not inside.all():
+            nets.keep(inside)
+            birds.keep(inside)
+        birds.animate()
+        timings["physics"] += time.perf_counter() - t
+
+    return fitness.tolist(), timings, frames, bird_frames
+
+
+def memory_per_bird(genomes, config, batch):
+    """
+    bytes allocated for the birds and networks of a population
+    :return: float
+    """
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    nets = [neat.nn.FeedForwardNetwork.create(genome, config) for genome_id, genome in genomes]
+    if batch:
+        players = (NetworkBatch(nets), BirdBatch(len(nets), 230, 350, fb.BIRD_FRAMES))
+        del nets
+    else:
+        players = (nets, [fb.Bird(230, 350) for net in nets])
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return used / len(genomes)
+
+
+def bench(config, size, seed, mode, draw=False):
+    """
+    benchmark one population size with one simulation
+    :param config: NEAT config
+    :param size: number of birds
+    :param seed: seed for the population and the course
+    :param mode: "objects" or "batch"
+    :param draw: also draw every frame (objects only)
+    :return: dict of results
+    """
+    genomes = make_genomes(config, size, seed)
+    course = Course(seed).precompute(fb.MAX_SCORE + 1)
+
+    start = time.perf_counter()
+    if mode == "batch":
+        fitness, timings, frames, bird_frames = bench_batch(genomes, config, course)
+    else:
+        fitness, timings, frames, bird_frames = bench_objects(genomes, config, course, draw)
+    seconds = time.perf_counter() - start
+
+    # make sure the timed loops still play the real game. Each is checked
+    # against its own simulation, the batched networks are only equal to
+    # neat's to within rounding (see NetworkBatch)
+    simulate = fb.simulate_batch if mode == "batch" else fb.simulate
+    simulate(genomes, config, course)
+    if fitness != [genome.fitness for genome_id, genome in genomes]:
+        raise RuntimeError("the {} benchmark no longer matches flappy_bird.{}".format(mode, simulate.__name__))
+
+    return {
+        "mode": mode,
+        "population": size,
+        "seed": seed,
+        "frames": frames,
+        "seconds": seconds,
+        "frames_per_sec": frames / seconds,
+        "bird_frames_per_sec": bird_frames / seconds,
+        "phases": timings,
+        "bytes_per_bird": memory_per_bird(genomes, config, mode == "batch"),
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark the flappy bird NEAT simulation.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[50, 500, 5000])
+    parser.add_argument("--seeds", type=int, nargs="+", default=[0])
+    parser.add_argument("--modes", nargs="+", choices=["objects", "batch"], default=["objects", "batch"])
+    parser.add_argument("--draw", action="store_true", help="also time drawing every frame (objects only)")
+    parser.add_argument("--output", metavar="FILE", help="write the results to FILE as JSON")
+    args = parser.parse_args()
+
+    local_dir = os.path.dirname(__file__)
+    config = neat.config.Config(neat.DefaultGenome, neat.DefaultReproduction,
+                                neat.DefaultSpeciesSet, neat.DefaultStagnation,
+                                os.path.join(local_dir, 'config-feedforward.txt'))
+
+    results = []
+    for mode in args.modes:
+        for size in args.sizes:
+            for seed in args.seeds:
+                result = bench(config, size, seed, mode, args.draw)
+                results.append(result)
+                print("{mode:>8} {population:>6} birds  seed {seed}: {frames} frames in {seconds:.2f}s, "
+                      "{frames_per_sec:.0f} frames/s, {bird_frames_per_sec:.0f} bird frames/s, "
+                      "{bytes_per_bird:.0f} bytes/bird".format(**result))
+                print(" " * 17 + ", ".join("{} {:.1%}".format(phase, result["phases"][phase] / result["seconds"])
+                                            for phase in PHASES))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({
+                "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "python": platform.python_version(),
+                "max_score": fb.MAX_SCORE,
+                "results": results,
+            }, f, indent=2)
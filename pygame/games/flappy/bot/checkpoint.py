@@ -0,0 +1,138 @@
+"""
+Checkpoints for long training runs. Like neat.Checkpointer, but the
+state is only snapshotted in the training loop; compressing it and
+writing it to disk happens in a background thread, and every file
+is written to a temporary name and renamed into place so a run that
+dies mid write never leaves a broken checkpoint behind.
+"""
+import atexit
+import glob
+import itertools
+import os
+import pickle
+import queue
+import random
+import threading
+import time
+import zlib
+
+import neat
+
+
+class AsyncCheckpointer(neat.Checkpointer):
+    """
+    saves the population, species, statistics and random state every
+    generation_interval generations or time_interval_seconds
+    """
+
+    def __init__(self, generation_interval=5, time_interval_seconds=300,
+                 filename_prefix='checkpoints/neat-checkpoint-', statistics=None, keep=3):
+        """
+        :param generation_interval: max generations between checkpoints
+        :param time_interval_seconds: max seconds between checkpoints
+        :param filename_prefix: the generation number is added to the end
+        :param statistics: StatisticsReporter to save with the population
+        :param keep: number of checkpoints to keep, None to keep them all
+        """
+        neat.Checkpointer.__init__(self, generation_interval, time_interval_seconds, filename_prefix)
+        self.statistics = statistics
+        self.keep = keep
+        self.queue = queue.Queue()
+        # a daemon so a checkpointer that is never closed doesn't keep the
+        # interpreter alive, the queued checkpoints are still written at exit
+        self.closed = False
+        self.thread = threading.Thread(target=self._writer, name="checkpoint-writer", daemon=True)
+        self.thread.start()
+        atexit.register(self.close)
+
+    def save_checkpoint(self, config, population, species_set, generation):
+        """
+        snapshot the current state and hand it to the writer thread.
+        Only the pickling happens here, the genomes are changed by the
+        next generation so it can't be done later
+        """
+        # the species set holds on to the reporters, including this one,
+        # and to an itertools.count, which can't always be pickled
+        reporters, indexer = species_set.reporters, species_set.indexer
+        next_species = next(indexer)
+        species_set.reporters, species_set.indexer = None, next_species
+        try:
+            # saved at the end of a generation, the population is already the next one
+            data = pickle.dumps((generation + 1, population, species_set, self.statistics, random.getstate()),
+                                protocol=pickle.HIGHEST_PROTOCOL)
+        finally:
+            species_set.reporters, species_set.indexer = reporters, itertools.count(next_species)
+        self.queue.put(('{0}{1}'.format(self.filename_prefix, generation + 1), data))
+
+    def _writer(self):
+        """
+        writer thread, compresses and atomically writes queued checkpoints
+        """
+        while True:
+            item = self.queue.get()
+            if item is None:
+                return
+            filename, data = item
+            directory = os.path.dirname(filename)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+            start = time.time()
+            tmp = filename + '.tmp'
+            try:
+                with open(tmp, 'wb') as f:
+                    f.write(zlib.compress(data, 6))
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp, filename)
+            except OSError as e:
+                print("Could not save checkpoint {0}: {1}".format(filename, e))
+                continue
+            print("Saved checkpoint {0} in {1:.2f}s".format(filename, time.time() - start))
+
+            if self.keep is not None:
+                for old in self.checkpoints(self.filename_prefix)[:-self.keep]:
+                    os.remove(old)
+
+    def close(self):
+        """
+        wait for the queued checkpoints to be written and stop the thread
+        :return: None
+        """
+        if self.closed:
+            return
+        self.closed = True
+        self.queue.put(None)
+        self.thread.join()
+
+    @staticmethod
+    def checkpoints(filename_prefix='checkpoints/neat-checkpoint-'):
+        """
+        the checkpoint files with the given prefix, oldest first
+        :return: list of filenames
+        """
+        found = []
+        for filename in glob.glob(glob.escape(filename_prefix) + '*'):
+            suffix = filename[len(filename_prefix):]
+            if suffix.isdigit():
+                found.append((int(suffix), filename))
+        return [filename for generation, filename in sorted(found)]
+
+    @staticmethod
+    def restore(filename, config):
+        """
+        resume training from a checkpoint. Not neat's restore_checkpoint,
+        the file format is different and the statistics come back too
+        :param filename: checkpoint file
+        :param config: NEAT config to continue with
+        :return: (neat.Population, StatisticsReporter or None)
+        """
+        with open(filename, 'rb') as f:
+            generation, population, species_set, statistics, rndstate = pickle.loads(zlib.decompress(f.read()))
+        random.setstate(rndstate)
+        p = neat.Population(config, (population, species_set, generation))
+        species_set.reporters = p.reporters
+        species_set.indexer = itertools.count(species_set.indexer)
+        # carry on numbering new genomes after the ones we already have
+        p.reproduction.genome_indexer = itertools.count(max(population) + 1)
+        return p, statistics
@@ -0,0 +1,91 @@
+"""
+Seeded pipe courses and recorded episodes for the flappy bird bot.
+A Course turns a seed into the heights of every pipe of a game, so
+the same seed always gives the same pipes, and an Episode is enough
+to play one bird's run again frame for frame.
+"""
+import json
+import random
+
+
+class Course:
+    """
+    the heights of the pipes of one game, in the order they appear
+    """
+    LOW = 50
+    HIGH = 450
+
+    def __init__(self, seed=None):
+        """
+        Initialize the course
+        :param seed: int, a random one is picked if None
+        :return: None
+        """
+        if seed is None:
+            seed = random.randrange(2**32)
+        self.seed = seed
+        self.heights = []
+        self.rng = random.Random(seed)
+
+    def __getitem__(self, index):
+        """
+        height of the gap of the index-th pipe, generated on demand
+        :param index: int
+        :return: int
+        """
+        while len(self.heights) <= index:
+            self.heights.append(self.rng.randrange(self.LOW, self.HIGH))
+        return self.heights[index]
+
+    def precompute(self, length):
+        """
+        generate the first length pipes up front, so copies of the
+        course (like the ones sent to worker processes) don't have to
+        :param length: int
+        :return: self
+        """
+        self[length - 1]
+        return self
+
+
+class Episode:
+    """
+    one bird's run: the course it flew and the frames it jumped on
+    """
+
+    def __init__(self, seed, genome_id, jumps, fitness=None):
+        """
+        Initialize the episode
+        :param seed: seed of the Course
+        :param genome_id: key of the genome that played
+        :param jumps: list of frame numbers the bird jumped on
+        :param fitness: fitness the run got, to check replays against
+        :return: None
+        """
+        self.seed = seed
+        self.genome_id = genome_id
+        self.jumps = jumps
+        self.fitness = fitness
+
+    def __repr__(self):
+        return "Episode(seed={}, genome_id={}, jumps={}, fitness={})".format(
+            self.seed, self.genome_id, len(self.jumps), self.fitness)
+
+    def save(self, filename):
+        """
+        append the episode to a file with one JSON episode per line
+        :param filename: str
+        :return: None
+        """
+        with open(filename, "a") as f:
+            f.write(json.dumps(self.__dict__) + "\n")
+
+    @staticmethod
+    def load(filename):
+        """
+        read every episode saved to a file
+        :param filename: str
+        :return: list of Episode
+        """
+        with open(filename) as f:
+            return [Episode(**json.loads(line)) for line in f if line.strip()]
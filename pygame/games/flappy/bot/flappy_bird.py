@@ -9,10 +9,17 @@ Estimated Work Time: 5 hours (1 just for that damn collision)
 import pygame
 import random
 import os
+import argparse
+import multiprocessing
 import time
 import neat
+import numpy as np
 import visualize
 import pickle
+from batch import BirdBatch, NetworkBatch, mask_to_array, column_spans
+from course import Course, Episode
+from checkpoint import AsyncCheckpointer
+from telemetry import TelemetryReporter
 pygame.font.init()  # init font
 
 WIN_WIDTH = 600
@@ -21,16 +28,37 @@ FLOOR = 730
 STAT_FONT = pygame.font.SysFont("comicsans", 50)
 END_FONT = pygame.font.SysFont("comicsans", 70)
 DRAW_LINES = False
+RENDER_EVERY = 1  # draw every Nth generation, 0 to never open a window
+MAX_SCORE = 50  # end a generation once the birds get this far
+RECORD = None  # file to save the best bird of every generation to
 
-WIN = pygame.display.set_mode((WIN_WIDTH, WIN_HEIGHT))
-pygame.display.set_caption("Flappy Bird")
+# the window is only opened the first time a generation is rendered so
+# that headless training works without a display
+WIN = None
 
-pipe_img = pygame.transform.scale2x(pygame.image.load(os.path.join("imgs","pipe.png")).convert_alpha())
-bg_img = pygame.transform.scale(pygame.image.load(os.path.join("imgs","bg.png")).convert_alpha(), (600, 900))
+pipe_img = pygame.transform.scale2x(pygame.image.load(os.path.join("imgs","pipe.png")))
+pipe_top_img = pygame.transform.flip(pipe_img, False, True)
+bg_img = pygame.transform.scale(pygame.image.load(os.path.join("imgs","bg.png")), (600, 900))
 bird_images = [pygame.transform.scale2x(pygame.image.load(os.path.join("imgs","bird" + str(x) + ".png"))) for x in range(1,4)]
-base_img = pygame.transform.scale2x(pygame.image.load(os.path.join("imgs","base.png")).convert_alpha())
+base_img = pygame.transform.scale2x(pygame.image.load(os.path.join("imgs","base.png")))
+
+# collision masks of every sprite that can collide, built once instead
+# of for every bird and pipe on every frame
+MASKS = {img: pygame.mask.from_surface(img) for img in bird_images + [pipe_top_img, pipe_img]}
+
+# rotated bird frames keyed by (image, tilt), the tilt only ever takes a
+# handful of values so this stays small
+ROTATED = {}
+
+# pixel data of the sprites for the vectorized simulation
+BIRD_FRAMES = [mask_to_array(MASKS[img]) for img in bird_images]
+PIPE_TOP_SPANS = column_spans(mask_to_array(MASKS[pipe_top_img]))
+PIPE_BOTTOM_SPANS = column_spans(mask_to_array(MASKS[pipe_img]))
 
 gen = 0
+BATCH = False  # simulate undrawn generations with BirdBatch
+POOL = None  # worker processes used by eval_genomes when training in parallel
+WORKERS = 1
 
 class Bird:
     """
@@ -92,10 +120,11 @@ class Bird:
             if self.tilt > -90:
                 self.tilt -= self.ROT_VEL
 
-    def draw(self, win):
+    def animate(self):
         """
-        draw the bird
-        :param win: pygame window or surface
+        advance the flapping animation. The current frame is also
+        what get_mask uses, so this is part of the simulation and
+        runs whether or not the bird is drawn
         :return: None
         """
         self.img_count += 1
@@ -118,16 +147,21 @@ class Bird:
             self.img = self.IMGS[1]
             self.img_count = self.ANIMATION_TIME*2
 
-
+    def draw(self, win):
+        """
+        draw the bird
+        :param win: pygame window or surface
+        :return: None
+        """
         # tilt the bird
         blitRotateCenter(win, self.img, (self.x, self.y), self.tilt)
 
     def get_mask(self):
         """
         gets the mask for the current image of the bird
-        :return: None
+        :return: pygame.mask.Mask
         """
-        return pygame.mask.from_surface(self.img)
+        return get_mask(self.img)
 
 
 class Pipe():
@@ -137,11 +171,11 @@ class Pipe():
     GAP = 200
     VEL = 5
 
-    def __init__(self, x):
+    def __init__(self, x, height=None):
         """
         initialize pipe object
         :param x: int
-        :param y: int
+        :param height: height of the gap, random if None
         :return" None
         """
         self.x = x
@@ -151,19 +185,22 @@ class Pipe():
         self.top = 0
         self.bottom = 0
 
-        self.PIPE_TOP = pygame.transform.flip(pipe_img, False, True)
+        self.PIPE_TOP = pipe_top_img
         self.PIPE_BOTTOM = pipe_img
 
         self.passed = False
 
-        self.set_height()
+        self.set_height(height)
 
-    def set_height(self):
+    def set_height(self, height=None):
         """
         set the height of the pipe, from the top of the screen
+        :param height: height of the gap, random if None
         :return: None
         """
-        self.height = random.randrange(50, 450)
+        if height is None:
+            height = random.randrange(Course.LOW, Course.HIGH)
+        self.height = height
         self.top = self.height - self.PIPE_TOP.get_height()
         self.bottom = self.height + self.GAP
 
@@ -192,9 +229,17 @@ class Pipe():
         :param bird: Bird object
         :return: Bool
         """
+        # cheap bounding box checks first, most birds are nowhere near
+        # the pipe or are flying through the middle of the gap
+        bird_y = round(bird.y)
+        if bird.x + bird.img.get_width() <= self.x or self.x + self.PIPE_TOP.get_width() <= bird.x:
+            return False
+        if bird_y >= self.height and bird_y + bird.img.get_height() <= self.bottom:
+            return False
+
         bird_mask = bird.get_mask()
-        top_mask = pygame.mask.from_surface(self.PIPE_TOP)
-        bottom_mask = pygame.mask.from_surface(self.PIPE_BOTTOM)
+        top_mask = get_mask(self.PIPE_TOP)
+        bottom_mask = get_mask(self.PIPE_BOTTOM)
         top_offset = (self.x - bird.x, self.top - round(bird.y))
         bottom_offset = (self.x - bird.x, self.bottom - round(bird.y))
 
@@ -247,6 +292,16 @@ class Base:
         win.blit(self.IMG, (self.x2, self.y))
 
 
+def get_mask(img):
+    """
+    gets the collision mask of a sprite, only built the first time
+    :param img: pygame surface
+    :return: pygame.mask.Mask
+    """
+    if img not in MASKS:
+        MASKS[img] = pygame.mask.from_surface(img)
+    return MASKS[img]
+
 def blitRotateCenter(surf, image, topleft, angle):
     """
     Rotate a surface and blit it to the window
@@ -256,11 +311,37 @@ def blitRotateCenter(surf, image, topleft, angle):
     :param angle: a float value for angle
     :return: None
     """
-    rotated_image = pygame.transform.rotate(image, angle)
+    if (image, angle) not in ROTATED:
+        ROTATED[image, angle] = pygame.transform.rotate(image, angle)
+    rotated_image = ROTATED[image, angle]
     new_rect = rotated_image.get_rect(center = image.get_rect(topleft = topleft).center)
 
     surf.blit(rotated_image, new_rect.topleft)
 
+def open_window():
+    """
+    opens the game window the first time it is needed
+    :return: pygame window surface
+    """
+    global WIN, bg_img, pipe_img, pipe_top_img, base_img
+    if WIN is None:
+        WIN = pygame.display.set_mode((WIN_WIDTH, WIN_HEIGHT))
+        pygame.display.set_caption("Flappy Bird")
+        bg_img = bg_img.convert_alpha()
+
+        # the sprites can only be converted once there is a display,
+        # the masks of the converted ones have the same pixels
+        for img in (pipe_img, pipe_top_img):
+            del MASKS[img]
+        pipe_img = pipe_img.convert_alpha()
+        pipe_top_img = pygame.transform.flip(pipe_img, False, True)
+        for img in (pipe_img, pipe_top_img):
+            MASKS[img] = pygame.mask.from_surface(img)
+        base_img = base_img.convert_alpha()
+        Base.IMG = base_img
+    return WIN
+
+
 def draw_window(win, birds, pipes, base, score, gen, pipe_ind):
     """
     draws the windows for the main game loop
@@ -306,45 +387,48 @@ def draw_window(win, birds, pipes, base, score, gen, pipe_ind):
     pygame.display.update()
 
 
-def eval_genomes(genomes, config):
+def play(players, course, render=False):
     """
-    runs the simulation of the current population of
-    birds and sets their fitness based on the distance they
-    reach in the game.
+    plays one game with a bird for each player. A bird's fitness only
+    depends on its own decisions and the pipes, so the same course
+    gives the same fitness no matter who else is in the game.
+    :param players: list of functions taking the frame number and the
+                    network inputs and returning True to jump
+    :param course: Course with the pipe heights
+    :param render: draw the game at 30 FPS
+    :return: (fitness, jumps, score), fitness and jumps being lists
+             with one entry per player, jumps the frame numbers the
+             bird jumped on, and score the number of pipes passed
     """
-    global WIN, gen
-    win = WIN
-    gen += 1
+    win = open_window() if render else None
 
-    # start by creating lists holding the genome itself, the
-    # neural network associated with the genome and the
-    # bird object that uses that network to play
-    nets = []
-    birds = []
-    ge = []
-    for genome_id, genome in genomes:
-        genome.fitness = 0  # start with fitness level of 0
-        net = neat.nn.FeedForwardNetwork.create(genome, config)
-        nets.append(net)
-        birds.append(Bird(230,350))
-        ge.append(genome)
+    # birds still alive and the index of the player flying each one
+    birds = [Bird(230,350) for player in players]
+    ids = list(range(len(players)))
+    fitness = [0] * len(players)  # start with fitness level of 0
+    jumps = [[] for player in players]
 
     base = Base(FLOOR)
-    pipes = [Pipe(700)]
+    pipes = [Pipe(700, course[0])]
     score = 0
+    frame = 0
 
     clock = pygame.time.Clock()
 
     run = True
-    while run and len(birds) > 0:
-        clock.tick(30)
-
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                run = False
-                pygame.quit()
-                quit()
-                break
+    while run and len(birds) > 0 and score < MAX_SCORE:
+        if render:
+            clock.tick(30)
+
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    run = False
+                    pygame.quit()
+                    quit()
+                    break
+        elif WIN is not None:
+            # keep the window of an earlier rendered generation responsive
+            pygame.event.pump()
 
         pipe_ind = 0
         if len(birds) > 0:
@@ -352,14 +436,13 @@ def eval_genomes(genomes, config):
                 pipe_ind = 1                                                                 # pipe on the screen for neural network input
 
         for x, bird in enumerate(birds):  # give each bird a fitness of 0.1 for each frame it stays alive
-            ge[x].fitness += 0.1
+            fitness[ids[x]] += 0.1
             bird.move()
 
             # send bird location, top pipe location and bottom pipe location and determine from network whether to jump or not
-            output = nets[birds.index(bird)].activate((bird.y, abs(bird.y - pipes[pipe_ind].height), abs(bird.y - pipes[pipe_ind].bottom)))
-
-            if output[0] > 0.5:  # we use a tanh activation function so result will be between -1 and 1. if over 0.5 jump
+            if players[ids[x]](frame, (bird.y, abs(bird.y - pipes[pipe_ind].height), abs(bird.y - pipes[pipe_ind].bottom))):
                 bird.jump()
+                jumps[ids[x]].append(frame)
 
         base.move()
 
@@ -368,11 +451,10 @@ def eval_genomes(genomes, config):
         for pipe in pipes:
             pipe.move()
             # check for collision
-            for bird in birds:
+            for bird in birds[:]:
                 if pipe.collide(bird, win):
-                    ge[birds.index(bird)].fitness -= 1
-                    nets.pop(birds.index(bird))
-                    ge.pop(birds.index(bird))
+                    fitness[ids[birds.index(bird)]] -= 1
+                    ids.pop(birds.index(bird))
                     birds.pop(birds.index(bird))
 
             if pipe.x + pipe.PIPE_TOP.get_width() < 0:
@@ -385,57 +467,321 @@ def eval_genomes(genomes, config):
         if add_pipe:
             score += 1
             # can add this line to give more reward for passing through a pipe (not required)
-            for genome in ge:
-                genome.fitness += 5
-            pipes.append(Pipe(WIN_WIDTH))
+            for x in ids:
+                fitness[x] += 5
+            pipes.append(Pipe(WIN_WIDTH, course[score]))
 
         for r in rem:
             pipes.remove(r)
 
-        for bird in birds:
+        for bird in birds[:]:
             if bird.y + bird.img.get_height() - 10 >= FLOOR or bird.y < -50:
-                nets.pop(birds.index(bird))
-                ge.pop(birds.index(bird))
+                ids.pop(birds.index(bird))
                 birds.pop(birds.index(bird))
 
-        draw_window(WIN, birds, pipes, base, score, gen, pipe_ind)
+        for bird in birds:
+            bird.animate()
+
+        if render:
+            draw_window(win, birds, pipes, base, score, gen, pipe_ind)
+
+        frame += 1
+
+    return fitness, jumps, score
+
+
+def simulate(genomes, config, course=None, render=False, episodes=None):
+    """
+    plays one game with a bird for each genome and sets every
+    genome's fitness based on the distance it reaches.
+    :param genomes: list of (genome_id, genome) tuples
+    :param config: NEAT config
+    :param course: Course with the pipe heights, random if None
+    :param render: draw the game at 30 FPS
+    :param episodes: optional dict to store every genome's Episode in
+    :return: None
+    """
+    if course is None:
+        course = Course()
+
+    players = []
+    for genome_id, genome in genomes:
+        net = neat.nn.FeedForwardNetwork.create(genome, config)
+        # we use a tanh activation function so result will be between -1 and 1. if over 0.5 jump
+        players.append(lambda frame, inputs, net=net: net.activate(inputs)[0] > 0.5)
+
+    fitness, jumps, score = play(players, course, render)
+
+    for (genome_id, genome), genome_fitness, genome_jumps in zip(genomes, fitness, jumps):
+        genome.fitness = genome_fitness
+        if episodes is not None:
+            episodes[genome_id] = Episode(course.seed, genome_id, genome_jumps, genome_fitness)
+
 
-        # break if score gets large enough
-        '''if score > 20:
-            pickle.dump(nets[0],open("best.pickle", "wb"))
-            break'''
+def replay(episode, render=True):
+    """
+    plays a recorded episode again, the bird jumps on exactly the
+    frames it jumped on when it was recorded
+    :param episode: Episode
+    :param render: draw the game at 30 FPS
+    :return: fitness of the replay, the same as episode.fitness
+    """
+    jumps = set(episode.jumps)
+    fitness, _, _ = play([lambda frame, inputs: frame in jumps], Course(episode.seed), render)
+    return fitness[0]
 
 
-def run(config_file):
+def simulate_batch(genomes, config, course=None, episodes=None):
+    """
+    plays the same game as simulate, but moves all the birds at once
+    with a BirdBatch instead of one Bird object each and activates
+    every network in one pass with a NetworkBatch, which is much
+    faster for big populations. The fitness of every genome is the
+    same as with simulate, unless one of its network outputs lands
+    within rounding error of the 0.5 jump threshold (see
+    NetworkBatch). Never drawn.
+    :param genomes: list of (genome_id, genome) tuples
+    :param config: NEAT config
+    :param course: Course with the pipe heights, random if None
+    :param episodes: optional dict to store every genome's Episode in
+    :return: None
+    """
+    if course is None:
+        course = Course()
+    ge = [genome for genome_id, genome in genomes]
+    nets = NetworkBatch([neat.nn.FeedForwardNetwork.create(genome, config) for genome in ge])
+    birds = BirdBatch(len(ge), 230, 350, BIRD_FRAMES)
+    fitness = np.zeros(len(ge))
+    jumps = []  # (frame, birds that jumped) for every frame
+
+    pipes = [Pipe(700, course[0])]
+    score = 0
+    frame = 0
+
+    while len(birds) > 0 and score < MAX_SCORE:
+        if WIN is not None:
+            pygame.event.pump()
+
+        pipe_ind = 0
+        if len(pipes) > 1 and birds.x > pipes[0].x + pipes[0].PIPE_TOP.get_width():
+            pipe_ind = 1
+
+        fitness[birds.ids] += 0.1
+        birds.move()
+
+        inputs = birds.inputs(pipes[pipe_ind].height, pipes[pipe_ind].bottom)
+        jump = nets.activate(inputs)[:, 0] > 0.5
+        birds.jump(jump)
+        if episodes is not None:
+            jumps.append((frame, birds.ids[jump]))
+
+        rem = []
+        add_pipe = False
+        for pipe in pipes:
+            pipe.move()
+            # check for collision
+            hit = birds.collide(pipe.x, pipe.top, PIPE_TOP_SPANS) | birds.collide(pipe.x, pipe.bottom, PIPE_BOTTOM_SPANS)
+            if hit.any():
+                fitness[birds.ids[hit]] -= 1
+                nets.keep(~hit)
+                birds.keep(~hit)
+
+            if pipe.x + pipe.PIPE_TOP.get_width() < 0:
+                rem.append(pipe)
+
+            if not pipe.passed and pipe.x < birds.x:
+                pipe.passed = True
+                add_pipe = True
+
+        if add_pipe:
+            score += 1
+            fitness[birds.ids] += 5
+            pipes.append(Pipe(WIN_WIDTH, course[score]))
+
+        for r in rem:
+            pipes.remove(r)
+
+        inside = (birds.y + birds.img_height - 10 < FLOOR) & (birds.y >= -50)
+        if not inside.all():
+            nets.keep(inside)
+            birds.keep(inside)
+        birds.animate()
+        frame += 1
+
+    for genome, genome_fitness in zip(ge, fitness.tolist()):
+        genome.fitness = genome_fitness
+
+    if episodes is not None:
+        genome_jumps = [[] for genome in ge]
+        for jump_frame, jumped in jumps:
+            for x in jumped.tolist():
+                genome_jumps[x].append(jump_frame)
+        for (genome_id, genome), frames in zip(genomes, genome_jumps):
+            episodes[genome_id] = Episode(course.seed, genome_id, frames, genome.fitness)
+
+
+def eval_chunk(genomes, config, course, batch=False):
+    """
+    worker side of the parallel evaluator, simulates a slice of
+    the population without a display
+    :return: list of Episodes in the order of genomes
+    """
+    episodes = {}
+    if batch:
+        simulate_batch(genomes, config, course, episodes)
+    else:
+        simulate(genomes, config, course, episodes=episodes)
+    return [episodes[genome_id] for genome_id, genome in genomes]
+
+
+def eval_genomes(genomes, config):
+    """
+    runs the simulation of the current population of
+    birds and sets their fitness based on the distance they
+    reach in the game. Only every RENDER_EVERY generations is
+    drawn (at 30 FPS), the rest run as fast as the CPU allows,
+    split across POOL if there is one.
+    """
+    global gen
+    gen += 1
+    render = RENDER_EVERY > 0 and (gen - 1) % RENDER_EVERY == 0
+
+    # every bird in a generation faces the same pipes, wherever it is
+    # simulated, so generate them once for all the workers
+    course = Course().precompute(MAX_SCORE + 1)
+
+    if render:
+        episodes = {}
+        simulate(genomes, config, course, render, episodes)
+        episodes = [episodes[genome_id] for genome_id, genome in genomes]
+    elif POOL is None:
+        episodes = eval_chunk(genomes, config, course, BATCH)
+    else:
+        # a few chunks per worker so that slices with long lived birds
+        # don't leave the other workers idle
+        n = WORKERS * 4
+        size = (len(genomes) + n - 1) // n
+        chunks = [genomes[i:i + size] for i in range(0, len(genomes), size)]
+        result = POOL.starmap_async(eval_chunk, [(chunk, config, course, BATCH) for chunk in chunks])
+        while WIN is not None and not result.ready():
+            pygame.event.pump()
+            result.wait(1 / 30)
+        results = result.get()
+        episodes = [episode for result in results for episode in result]
+
+    for (genome_id, genome), episode in zip(genomes, episodes):
+        genome.fitness = episode.fitness
+
+    if RECORD is not None:
+        max(episodes, key=lambda episode: episode.fitness).save(RECORD)
+
+
+def run(config_file, generations=50, render_every=1, workers=1, batch=False, record=None,
+        checkpoint_every=None, resume=False, telemetry=None):
     """
     runs the NEAT algorithm to train a neural network to play flappy bird.
     :param config_file: location of config file
+    :param generations: number of generations to train for
+    :param render_every: draw every Nth generation, 0 for headless
+    :param workers: number of processes to evaluate genomes with
+    :param batch: use the vectorized simulation for undrawn generations
+    :param record: file to save the best bird of every generation to
+    :param checkpoint_every: save a checkpoint every this many generations
+    :param resume: carry on from the latest checkpoint, if there is one
+    :param telemetry: file to append the statistics of every generation to
     :return: None
     """
+    global RENDER_EVERY, POOL, WORKERS, BATCH, RECORD, gen
+    RENDER_EVERY = render_every
+    BATCH = batch
+    RECORD = record
+    WORKERS = workers
+    if workers > 1:
+        POOL = multiprocessing.Pool(workers)
+
     config = neat.config.Config(neat.DefaultGenome, neat.DefaultReproduction,
                          neat.DefaultSpeciesSet, neat.DefaultStagnation,
                          config_file)
 
     # Create the population, which is the top-level object for a NEAT run.
-    p = neat.Population(config)
+    checkpoints = AsyncCheckpointer.checkpoints()
+    stats = None
+    if resume and checkpoints:
+        print("Resuming from {0}".format(checkpoints[-1]))
+        p, stats = AsyncCheckpointer.restore(checkpoints[-1], config)
+        gen = p.generation
+    else:
+        p = neat.Population(config)
 
     # Add a stdout reporter to show progress in the terminal.
     p.add_reporter(neat.StdOutReporter(True))
-    stats = neat.StatisticsReporter()
+    if stats is None:
+        stats = neat.StatisticsReporter()
     p.add_reporter(stats)
-    #p.add_reporter(neat.Checkpointer(5))
-
-    # Run for up to 50 generations.
-    winner = p.run(eval_genomes, 50)
+    reporter = None
+    if telemetry:
+        reporter = TelemetryReporter(telemetry)
+        p.add_reporter(reporter)
+    checkpointer = None
+    if checkpoint_every:
+        checkpointer = AsyncCheckpointer(checkpoint_every, statistics=stats)
+        checkpointer.last_generation_checkpoint = p.generation - 1
+        p.add_reporter(checkpointer)
+
+    # Run for up to the given number of generations.
+    try:
+        winner = p.run(eval_genomes, max(generations - p.generation, 1))
+    finally:
+        if checkpointer is not None:
+            checkpointer.close()
+        if reporter is not None:
+            reporter.close()
+        if POOL is not None:
+            POOL.close()
+            POOL.join()
+            POOL = None
 
     # show final stats
     print('\nBest genome:\n{!s}'.format(winner))
 
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Train a NEAT bot to play flappy bird.")
+    parser.add_argument("--generations", type=int, default=50)
+    parser.add_argument("--render-every", type=int, default=1,
+                        help="draw every Nth generation (default: every one)")
+    parser.add_argument("--headless", action="store_true",
+                        help="never open a window, train as fast as possible")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="number of processes to evaluate genomes with")
+    parser.add_argument("--batch", action="store_true",
+                        help="simulate undrawn generations with NumPy arrays")
+    parser.add_argument("--seed", type=int,
+                        help="seed the run so the courses and the evolution can be repeated")
+    parser.add_argument("--record", metavar="FILE",
+                        help="save the best bird of every generation to FILE")
+    parser.add_argument("--checkpoint", type=int, metavar="N",
+                        help="save a checkpoint to checkpoints/ every N generations")
+    parser.add_argument("--resume", action="store_true",
+                        help="carry on from the latest checkpoint")
+    parser.add_argument("--telemetry", metavar="FILE",
+                        help="append the statistics of every generation to FILE, see telemetry.py")
+    parser.add_argument("--replay", metavar="FILE",
+                        help="watch the last bird saved to FILE instead of training")
+    args = parser.parse_args()
+
+    if args.seed is not None:
+        random.seed(args.seed)
+
+    if args.replay:
+        episode = Episode.load(args.replay)[-1]
+        print("{!r} replayed with fitness {}".format(episode, replay(episode, not args.headless)))
+        quit()
+
     # Determine path to configuration file. This path manipulation is
     # here so that the script will run successfully regardless of the
     # current working directory.
     local_dir = os.path.dirname(__file__)
     config_path = os.path.join(local_dir, 'config-feedforward.txt')
-    run(config_path)
+    run(config_path, args.generations, 0 if args.headless else args.render_every, args.workers, args.batch, args.record,
+        args.checkpoint, args.resume, args.telemetry)
@@ -0,0 +1,126 @@
+"""
+Plays the trained network in best.pickle without a display, as fast
+as possible, over many seeded courses. Reports the score distribution,
+frames per second and the per-frame decision latency, so a trained
+model can be regression tested at scale.
+
+    python play_best.py --episodes 1000 --workers 4
+"""
+import argparse
+import collections
+import json
+import multiprocessing
+import pickle
+import time
+
+import numpy as np
+
+import flappy_bird as fb
+from course import Course
+
+NET = None  # the network being played, loaded once per process
+
+
+def load(filename, max_score=fb.MAX_SCORE):
+    """
+    load the pickled network in this process. Also sets the max score
+    here, spawned workers import flappy_bird afresh
+    :param filename: pickle file
+    :param max_score: end a game once the bird gets this far
+    :return: None
+    """
+    global NET
+    fb.MAX_SCORE = max_score
+    with open(filename, "rb") as f:
+        NET = pickle.load(f)
+
+
+def play_episode(seed):
+    """
+    play one game on the course of the given seed
+    :param seed: int
+    :return: (score, frames, seconds, decision latencies in seconds)
+    """
+    latencies = []
+
+    def player(frame, inputs):
+        start = time.perf_counter()
+        output = NET.activate(inputs)
+        latencies.append(time.perf_counter() - start)
+        return output[0] > 0.5
+
+    start = time.perf_counter()
+    fitness, jumps, score = fb.play([player], Course(seed))
+    return score, len(latencies), time.perf_counter() - start, latencies
+
+
+def run(filename, episodes, seed=0, workers=1, max_score=fb.MAX_SCORE):
+    """
+    play a pickled network on episodes courses, seeded seed, seed + 1...
+    :param filename: pickle file with a neat.nn.FeedForwardNetwork
+    :param episodes: number of games to play
+    :param seed: seed of the first course
+    :param workers: number of processes to play in
+    :param max_score: end a game once the bird gets this far
+    :return: dict of results
+    """
+    seeds = range(seed, seed + episodes)
+
+    start = time.perf_counter()
+    if workers > 1:
+        with multiprocessing.Pool(workers, initializer=load, initargs=(filename, max_score)) as pool:
+            results = pool.map(play_episode, seeds, chunksize=max(1, episodes // (workers * 8)))
+    else:
+        load(filename, max_score)
+        results = [play_episode(s) for s in seeds]
+    seconds = time.perf_counter() - start
+
+    scores = np.array([score for score, frames, episode_seconds, latencies in results])
+    frames = sum(frames for score, frames, episode_seconds, latencies in results)
+    latencies = np.concatenate([latencies for score, frames, episode_seconds, latencies in results])
+    return {
+        "episodes": episodes,
+        "seed": seed,
+        "max_score": max_score,
+        "seconds": seconds,
+        "frames": frames,
+        "frames_per_sec": frames / seconds,
+        "score": {
+            "mean": scores.mean(),
+            "min": int(scores.min()),
+            "p1": np.percentile(scores, 1),
+            "median": np.median(scores),
+            "max": int(scores.max()),
+            "finished": float(np.mean(scores >= max_score)),
+            "counts": dict((str(score), count) for score, count in sorted(collections.Counter(scores.tolist()).items())),
+        },
+        "latency_us": {
+            "mean": latencies.mean() * 1e6,
+            "p50": np.percentile(latencies, 50) * 1e6,
+            "p99": np.percentile(latencies, 99) * 1e6,
+            "max": latencies.max() * 1e6,
+        },
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Play a trained flappy bird bot headlessly.")
+    parser.add_argument("filename", nargs="?", default="best.pickle")
+    parser.add_argument("--episodes", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first course")
+    parser.add_argument("--workers", type=int, default=1, help="number of processes to play in")
+    parser.add_argument("--max-score", type=int, default=fb.MAX_SCORE,
+                        help="end a game once the bird gets this far (default: %(default)s)")
+    parser.add_argument("--output", metavar="FILE", help="write the results to FILE as JSON")
+    args = parser.parse_args()
+
+    results = run(args.filename, args.episodes, args.seed, args.workers, args.max_score)
+    score, latency = results["score"], results["latency_us"]
+    print("{episodes} episodes, {frames} frames in {seconds:.2f}s ({frames_per_sec:.0f} frames/s)".format(**results))
+    print("score: mean {mean:.1f}, min {min}, p1 {p1:.1f}, median {median:.1f}, max {max}, "
+          "{finished:.1%} reached the max score".format(**score))
+    print("decision latency: mean {mean:.1f}us, p50 {p50:.1f}us, p99 {p99:.1f}us, max {max:.1f}us".format(**latency))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
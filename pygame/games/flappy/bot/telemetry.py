@@ -0,0 +1,143 @@
+"""
+Streaming training statistics. TelemetryReporter appends one CSV row
+per generation while NEAT runs, instead of keeping the whole history in
+memory like neat.StatisticsReporter, and TelemetryReader hands back
+only the rows added since it last looked, so a plot or dashboard can
+follow a live run without rereading the file.
+
+    python telemetry.py telemetry.csv --output live.svg
+"""
+import argparse
+import csv
+import io
+import math
+import os
+import time
+
+from neat.math_util import mean, stdev
+from neat.reporting import BaseReporter
+
+COLUMNS = ("generation", "time", "seconds", "population", "fitness_mean", "fitness_stdev",
+           "fitness_best", "species", "species_sizes")
+
+
+class TelemetryReporter(BaseReporter):
+    """
+    appends the statistics of every generation to a CSV file
+    """
+
+    def __init__(self, filename='telemetry.csv'):
+        """
+        :param filename: log to append to, the header is written if it is new
+        """
+        new = not os.path.exists(filename) or os.path.getsize(filename) == 0
+        # a run resumed from a checkpoint goes over generations that are
+        # already in the log, those are skipped to keep it in order
+        rows = [] if new else TelemetryReader(filename).read_new()
+        self.last_generation = rows[-1]["generation"] if rows else None
+        self.file = open(filename, 'a', newline='')
+        self.writer = csv.writer(self.file)
+        if new:
+            self.writer.writerow(COLUMNS)
+            self.file.flush()
+        self.generation = None
+        self.start = None
+        self.row = None
+
+    def start_generation(self, generation):
+        self.generation = generation
+        self.start = time.time()
+
+    def post_evaluate(self, config, population, species, best_genome):
+        fitnesses = [genome.fitness for genome in population.values()]
+        sizes = sorted((sid, len(s.members)) for sid, s in species.species.items())
+        self.row = [self.generation, None, None, len(fitnesses),
+                    mean(fitnesses), stdev(fitnesses), best_genome.fitness,
+                    len(sizes), " ".join("{0}:{1}".format(sid, size) for sid, size in sizes)]
+
+    def end_generation(self, config, population, species_set):
+        # written once the generation is over so the time includes reproduction
+        self._write()
+
+    def found_solution(self, config, generation, best):
+        # neat stops without ending the generation that found a solution
+        self._write()
+
+    def _write(self):
+        """
+        write the row of the current generation, if it is still pending
+        """
+        if self.row is None:
+            return
+        row, self.row = self.row, None
+        if self.last_generation is not None and row[0] <= self.last_generation:
+            return
+        now = time.time()
+        row[1] = round(now, 3)
+        row[2] = round(now - self.start, 4)
+        self.writer.writerow(row)
+        self.file.flush()
+        self.last_generation = row[0]
+
+    def close(self):
+        self._write()
+        self.file.close()
+
+
+class TelemetryReader:
+    """
+    reads a telemetry log incrementally, remembering where it stopped
+    """
+
+    def __init__(self, filename='telemetry.csv'):
+        self.filename = filename
+        self.offset = 0
+        self.header = None
+
+    def read_new(self):
+        """
+        the complete rows written since the last call, a row that is
+        still being written is left for the next one
+        :return: list of dicts
+        """
+        if not os.path.exists(self.filename):
+            return []
+        with open(self.filename, 'rb') as f:
+            f.seek(self.offset)
+            data = f.read()
+        end = data.rfind(b"\n") + 1
+        self.offset += end
+
+        rows = []
+        for values in csv.reader(io.StringIO(data[:end].decode())):
+            if self.header is None:
+                self.header = values
+                continue
+            row = dict(zip(self.header, values))
+            for key in ("generation", "population", "species"):
+                row[key] = int(row[key])
+            for key in ("time", "seconds", "fitness_mean", "fitness_stdev", "fitness_best"):
+                row[key] = float(row[key]) if row[key] else math.nan
+            row["species_sizes"] = dict((int(sid), int(size)) for sid, size in
+                                        (item.split(":") for item in row["species_sizes"].split()))
+            rows.append(row)
+        return rows
+
+
+if __name__ == '__main__':
+    import visualize
+
+    parser = argparse.ArgumentParser(description="Plot a training run's telemetry as it is written.")
+    parser.add_argument("filename", nargs="?", default="telemetry.csv")
+    parser.add_argument("--interval", type=float, default=5, help="seconds between updates")
+    parser.add_argument("--output", metavar="FILE", help="save the plot to FILE instead of showing it")
+    args = parser.parse_args()
+
+    plot = visualize.LivePlot(args.filename)
+    while True:
+        if plot.update() and args.output:
+            plot.save(args.output)
+        if args.output:
+            time.sleep(args.interval)
+        else:
+            plot.pause(args.interval)
@@ -113,6 +113,73 @@ def plot_species(statistics, view=False, filename='speciation.svg'):
     plt.close()
 
 
+class LivePlot(object):
+    """ Fitness and speciation plots of a running training, read from a telemetry log one batch of new rows at a time. """
+    def __init__(self, filename='telemetry.csv'):
+        from telemetry import TelemetryReader
+
+        self.reader = TelemetryReader(filename)
+        self.generation = []
+        self.avg_fitness = []
+        self.stdev_fitness = []
+        self.best_fitness = []
+        self.species_sizes = []
+
+        self.fig, (self.fitness_ax, self.species_ax) = plt.subplots(2, 1, figsize=(8, 8))
+        self.avg_line, = self.fitness_ax.plot([], [], 'b-', label="average")
+        self.low_line, = self.fitness_ax.plot([], [], 'g-.', label="-1 sd")
+        self.high_line, = self.fitness_ax.plot([], [], 'g-.', label="+1 sd")
+        self.best_line, = self.fitness_ax.plot([], [], 'r-', label="best")
+
+        self.fitness_ax.set_title("Population's average and best fitness")
+        self.fitness_ax.set_xlabel("Generations")
+        self.fitness_ax.set_ylabel("Fitness")
+        self.fitness_ax.grid()
+        self.fitness_ax.legend(loc="best")
+
+    def update(self):
+        """ Reads the rows added since the last update and redraws. Returns the number of new rows. """
+        rows = self.reader.read_new()
+        if not rows:
+            return 0
+
+        for row in rows:
+            self.generation.append(row["generation"])
+            self.avg_fitness.append(row["fitness_mean"])
+            self.stdev_fitness.append(row["fitness_stdev"])
+            self.best_fitness.append(row["fitness_best"])
+            self.species_sizes.append(row["species_sizes"])
+
+        avg_fitness = np.array(self.avg_fitness)
+        stdev_fitness = np.array(self.stdev_fitness)
+        self.avg_line.set_data(self.generation, avg_fitness)
+        self.low_line.set_data(self.generation, avg_fitness - stdev_fitness)
+        self.high_line.set_data(self.generation, avg_fitness + stdev_fitness)
+        self.best_line.set_data(self.generation, self.best_fitness)
+        self.fitness_ax.relim()
+        self.fitness_ax.autoscale_view()
+
+        # a stack plot can't be extended, but it is cheap to redraw from
+        # the sizes already in memory
+        species = sorted(set(sid for sizes in self.species_sizes for sid in sizes))
+        curves = [[sizes.get(sid, 0) for sizes in self.species_sizes] for sid in species]
+        self.species_ax.clear()
+        self.species_ax.stackplot(self.generation, *curves)
+        self.species_ax.set_title("Speciation")
+        self.species_ax.set_ylabel("Size per Species")
+        self.species_ax.set_xlabel("Generations")
+
+        self.fig.tight_layout()
+        return len(rows)
+
+    def save(self, filename):
+        self.fig.savefig(filename)
+
+    def pause(self, interval):
+        """ Shows the plot and keeps the window responsive for interval seconds. """
+        plt.pause(interval)
+
+
 def draw_net(config, genome, view=False, filename=None, node_names=None, show_disabled=True, prune_unused=False,
              node_colors=None, fmt='svg'):
     """ Receives a genome and draws a neural network with arbitrary topology. """
@@ -1,45 +1,99 @@
 import pygame, sys, random 
 
+class PipePair:
+	def __init__(self):
+		self.bottom = pipe_surface.get_rect()
+		self.top = pipe_surface.get_rect()
+		self.scored = False
+
+class PipeRing:
+	# the pipe pairs on screen, oldest first, in reused slots that grow when all are in use
+	def __init__(self,capacity = 4):
+		self.pairs = [PipePair() for _ in range(capacity)]
+		self.head = 0
+		self.count = 0
+		self.passed = 0 # pairs at the head the bird is already past
+
+	def __iter__(self):
+		for i in range(self.count):
+			yield self.pairs[(self.head + i) % len(self.pairs)]
+
+	def clear(self):
+		self.head = 0
+		self.count = 0
+		self.passed = 0
+
+	def spawn(self,x,gap_y):
+		if self.count == len(self.pairs):
+			self.grow()
+		pair = self.pairs[(self.head + self.count) % len(self.pairs)]
+		pair.bottom.midtop = (x,gap_y)
+		pair.top.midbottom = (x,gap_y - 300)
+		pair.scored = False
+		self.count += 1
+
+	def grow(self):
+		# every slot holds a pair that may still be on screen (slow frames or
+		# several spawns at once), so make room instead of dropping one
+		self.pairs = list(self) + [PipePair() for _ in range(len(self.pairs))]
+		self.head = 0
+
+	def expire(self):
+		self.head = (self.head + 1) % len(self.pairs)
+		self.count -= 1
+		self.passed = max(self.passed - 1,0)
+
+	def next_pipe(self,left):
+		# the first pair the bird isn't past yet, the only one it can hit or score on
+		while self.passed < self.count:
+			pair = self.pairs[(self.head + self.passed) % len(self.pairs)]
+			if pair.bottom.right > left:
+				return pair
+			self.passed += 1
+		return None
+
 def draw_floor():
-	screen.blit(floor_surface,(floor_x_pos,900))
-	screen.blit(floor_surface,(floor_x_pos + 576,900))
+	floor_rect = screen.blit(floor_surface,(floor_x_pos,900))
+	next_floor_rect = screen.blit(floor_surface,(floor_x_pos + 576,900))
+	return [floor_rect,next_floor_rect]
 
 def create_pipe():
 	random_pipe_pos = random.choice(pipe_height)
-	bottom_pipe = pipe_surface.get_rect(midtop = (700,random_pipe_pos))
-	top_pipe = pipe_surface.get_rect(midbottom = (700,random_pipe_pos - 300))
-	return bottom_pipe,top_pipe
+	pipe_list.spawn(700,random_pipe_pos)
 
 def move_pipes(pipes):
-	for pipe in pipes:
-		pipe.centerx -= 5
-	visible_pipes = [pipe for pipe in pipes if pipe.right > -50]
-	return visible_pipes
+	for pair in pipes:
+		pair.bottom.centerx -= 5
+		pair.top.centerx -= 5
+	while pipes.count and pipes.pairs[pipes.head].bottom.right <= -50:
+		pipes.expire()
 
 def draw_pipes(pipes):
-	for pipe in pipes:
-		if pipe.bottom >= 1024:
-			screen.blit(pipe_surface,pipe)
-		else:
-			flip_pipe = pygame.transform.flip(pipe_surface,False,True)
-			screen.blit(flip_pipe,pipe)
+	pipe_rects = []
+	for pair in pipes:
+		pipe_rects.append(screen.blit(pipe_surface,pair.bottom))
+		pipe_rects.append(screen.blit(flip_pipe_surface,pair.top))
+	return pipe_rects
 
 def check_collision(pipes):
-	global can_score
-	for pipe in pipes:
-		if bird_rect.colliderect(pipe):
-			death_sound.play()
-			can_score = True
-			return False
+	pair = pipes.next_pipe(bird_rect.left)
+	if pair and (bird_rect.colliderect(pair.bottom) or bird_rect.colliderect(pair.top)):
+		death_sound.play()
+		return False
 
 	if bird_rect.top <= -100 or bird_rect.bottom >= 900:
-		can_score = True
 		return False
 
 	return True
 
+def build_bird_atlas(frames):
+	# every frame pre-rotated at each rotation_step degrees between min_rotation and max_rotation
+	steps = int((max_rotation - min_rotation) / rotation_step) + 1
+	return {frame: [pygame.transform.rotozoom(frame,min_rotation + step * rotation_step,1) for step in range(steps)] for frame in frames}
+
 def rotate_bird(bird):
-	new_bird = pygame.transform.rotozoom(bird,-bird_movement * 3,1)
+	angle = min(max(-bird_movement * 3,min_rotation),max_rotation)
+	new_bird = bird_atlas[bird][round((angle - min_rotation) / rotation_step)]
 	return new_bird
 
 def bird_animation():
@@ -51,15 +105,16 @@ def score_display(game_state):
 	if game_state == 'main_game':
 		score_surface = game_font.render(str(int(score)),True,(255,255,255))
 		score_rect = score_surface.get_rect(center = (288,100))
-		screen.blit(score_surface,score_rect)
+		return [screen.blit(score_surface,score_rect)]
 	if game_state == 'game_over':
 		score_surface = game_font.render(f'Score: {int(score)}' ,True,(255,255,255))
 		score_rect = score_surface.get_rect(center = (288,100))
-		screen.blit(score_surface,score_rect)
+		score_rect = screen.blit(score_surface,score_rect)
 
 		high_score_surface = game_font.render(f'High score: {int(high_score)}',True,(255,255,255))
 		high_score_rect = high_score_surface.get_rect(center = (288,850))
-		screen.blit(high_score_surface,high_score_rect)
+		high_score_rect = screen.blit(high_score_surface,high_score_rect)
+		return [score_rect,high_score_rect]
 
 def update_score(score, high_score):
 	if score > high_score:
@@ -67,16 +122,13 @@ def update_score(score, high_score):
 	return high_score
 
 def pipe_score_check():
-	global score, can_score 
+	global score
 	
-	if pipe_list:
-		for pipe in pipe_list:
-			if 95 < pipe.centerx < 105 and can_score:
-				score += 1
-				score_sound.play()
-				can_score = False
-			if pipe.centerx < 0:
-				can_score = True
+	pair = pipe_list.next_pipe(bird_rect.left)
+	if pair and not pair.scored and pair.bottom.centerx < 105:
+		score += 1
+		score_sound.play()
+		pair.scored = True
 
 #pygame.mixer.pre_init(frequency = 44100, size = 16, channels = 2, buffer = 1024)
 pygame.init()
@@ -90,7 +142,9 @@ bird_movement = 0
 game_active = True
 score = 0
 high_score = 0
-can_score = True
+# only redraw and update the parts of the screen that changed, set to False to redraw it all every frame
+dirty_rendering = True
+dirty_rects = []
 bg_surface = pygame.image.load('assets/background-day.png').convert()
 bg_surface = pygame.transform.scale2x(bg_surface)
 
@@ -102,6 +156,10 @@ bird_downflap = pygame.transform.scale2x(pygame.image.load('assets/bluebird-down
 bird_midflap = pygame.transform.scale2x(pygame.image.load('assets/bluebird-midflap.png').convert_alpha())
 bird_upflap = pygame.transform.scale2x(pygame.image.load('assets/bluebird-upflap.png').convert_alpha())
 bird_frames = [bird_downflap,bird_midflap,bird_upflap]
+min_rotation = -90
+max_rotation = 30
+rotation_step = 1.5
+bird_atlas = build_bird_atlas(bird_frames)
 bird_index = 0
 bird_surface = bird_frames[bird_index]
 bird_rect = bird_surface.get_rect(center = (100,512))
@@ -115,7 +173,8 @@ pygame.time.set_timer(BIRDFLAP,200)
 
 pipe_surface = pygame.image.load('assets/pipe-green.png')
 pipe_surface = pygame.transform.scale2x(pipe_surface)
-pipe_list = []
+flip_pipe_surface = pygame.transform.flip(pipe_surface,False,True)
+pipe_list = PipeRing()
 SPAWNPIPE = pygame.USEREVENT
 pygame.time.set_timer(SPAWNPIPE,1200)
 pipe_height = [400,600,800]
@@ -130,6 +189,9 @@ score_sound_countdown = 100
 SCOREEVENT = pygame.USEREVENT + 2
 pygame.time.set_timer(SCOREEVENT,100)
 
+screen.blit(bg_surface,(0,0))
+pygame.display.update()
+
 while True:
 	for event in pygame.event.get():
 		if event.type == pygame.QUIT:
@@ -148,7 +210,7 @@ while True:
 				score = 0
 
 		if event.type == SPAWNPIPE:
-			pipe_list.extend(create_pipe())
+			create_pipe()
 
 		if event.type == BIRDFLAP:
 			if bird_index < 2:
@@ -158,35 +220,46 @@ while True:
 
 			bird_surface,bird_rect = bird_animation()
 
-	screen.blit(bg_surface,(0,0))
+	if dirty_rendering:
+		# paint the background back over everything drawn last frame
+		for rect in dirty_rects:
+			screen.blit(bg_surface,rect,rect)
+	else:
+		screen.blit(bg_surface,(0,0))
+	drawn_rects = []
 
 	if game_active:
 		# Bird
 		bird_movement += gravity
 		rotated_bird = rotate_bird(bird_surface)
 		bird_rect.centery += bird_movement
-		screen.blit(rotated_bird,bird_rect)
+		drawn_rects.append(screen.blit(rotated_bird,bird_rect))
 		game_active = check_collision(pipe_list)
 
 		# Pipes
-		pipe_list = move_pipes(pipe_list)
-		draw_pipes(pipe_list)
+		move_pipes(pipe_list)
+		drawn_rects += draw_pipes(pipe_list)
 		
 		# Score
 		pipe_score_check()
-		score_display('main_game')
+		drawn_rects += score_display('main_game')
 	else:
-		screen.blit(game_over_surface,game_over_rect)
+		drawn_rects.append(screen.blit(game_over_surface,game_over_rect))
 		high_score = update_score(score,high_score)
-		score_display('game_over')
+		drawn_rects += score_display('game_over')
 
 
 	# Floor
 	floor_x_pos -= 1
-	draw_floor()
+	drawn_rects += draw_floor()
 	if floor_x_pos <= -576:
 		floor_x_pos = 0
 	
 
-	pygame.display.update()
+	if dirty_rendering:
+		# where things were last frame and where they are now
+		pygame.display.update(dirty_rects + drawn_rects)
+		dirty_rects = drawn_rects
+	else:
+		pygame.display.update()
 	clock.tick(120)
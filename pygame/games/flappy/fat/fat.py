@@ -17,11 +17,19 @@ bw=bg.get_width()
 blist=[[50,310],[60,300],[70,290],[80,280],[90,270],[100,260],[110,250],[120,240],[130,230],[140,220],[150,210],[160,200],[170,190],[180,180],
        [190,170],[200,160],[210,150],[220,140],[230,130],[240,120],[250,110],[260,100],[270,90],[280,80]
        ,[290,70],[300,60],[310,50]]
+#scaled once here with their masks, never in the frame loop
+def scaled(img,w,h):
+   img=pygame.transform.scale(img,(w,h))
+   return img,pygame.mask.from_surface(img)
+pframes=[scaled(img,100,85) for img in pimg]
+tp=pygame.image.load('tp.png')
+bp=pygame.image.load('bp.png')
+tframes={h[0]:scaled(tp,80,h[0]) for h in blist}
+bframes={h[1]:scaled(bp,80,h[1]) for h in blist}
 class Bird(pygame.sprite.Sprite):
    def __init__(self,game):
       super().__init__()
-      self.image=pimg[0]
-      self.image=pygame.transform.scale(self.image,(100,85))
+      self.image,self.mask=pframes[0]
       self.rect=self.image.get_rect()
       self.vel=vec(0,0)
       self.rect.center=(dw/2,dh/2)
@@ -36,13 +44,11 @@ class Bird(pygame.sprite.Sprite):
          self.acc.y=-1.5
          if self.fc+1<28:
             self.fc+=1
-            self.image=pimg[self.fc//7]
-            self.image=pygame.transform.scale(self.image,(100,85))
+            self.image,self.mask=pframes[self.fc//7]
          else:
             self.fc=0
       else:
-         self.image=pimg[0]
-         self.image=pygame.transform.scale(self.image,(100,85))
+         self.image,self.mask=pframes[0]
       self.vel+=self.acc
       self.pos+=self.vel+0.5*self.acc
       if self.pos.y<=0+self.rect.width/2:
@@ -50,27 +56,22 @@ class Bird(pygame.sprite.Sprite):
       if self.pos.y>=dh-self.rect.width/2:
          self.pos.y=dh-self.rect.width/2
       self.rect.center=self.pos
-      self.mask=pygame.mask.from_surface(self.image)
 class TBlock(pygame.sprite.Sprite):
    def __init__(self,x,h1):
       super().__init__()
-      self.image=pygame.image.load('tp.png')
-      self.image=pygame.transform.scale(self.image,(80,h1))
+      self.image,self.mask=tframes[h1]
       self.rect=self.image.get_rect()
       self.rect.x,self.rect.y=x,0
    def update(self):
       self.rect.x-=2
-      self.mask1=pygame.mask.from_surface(self.image)
 class BBlock(pygame.sprite.Sprite):
    def __init__(self,x,h2):
       super().__init__()
-      self.image=pygame.image.load('bp.png')
-      self.image=pygame.transform.scale(self.image,(80,h2))
+      self.image,self.mask=bframes[h2]
       self.rect=self.image.get_rect()
       self.rect.x,self.rect.y=x,dh-self.rect.height
    def update(self):
       self.rect.x-=2
-      self.mask2=pygame.mask.from_surface(self.image)
 class Game:
    def __init__(self):
       self.bgx=0
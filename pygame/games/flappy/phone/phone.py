@@ -13,6 +13,13 @@ PIPEGAPSIZE  = 100 # gap between upper and lower part of pipe
 BASEY        = SCREENHEIGHT * 0.79
 # image, sound and hitmask  dicts
 IMAGES, SOUNDS, HITMASKS = {}, {}, {}
+# every image and hitmask decoded so far, so that a new game reuses
+# them instead of loading them from disk again
+IMAGE_CACHE, HITMASK_CACHE = {}, {}
+# pre-rotated player frames, image -> {angle: surface}
+ROTATION_CACHE = {}
+# the player is only ever drawn at whole angles in this range
+ROTATION_RANGE = range(-97, 46)
 
 # list of all possible players (tuple of 3 positions of flap)
 PLAYERS_LIST = (
@@ -49,12 +56,6 @@ PIPES_LIST = (
 )
 
 
-try:
-    xrange
-except NameError:
-    xrange = range
-
-
 def main():
     global SCREEN, FPSCLOCK
     pygame.init()
@@ -98,37 +99,40 @@ def main():
     while True:
         # select random background sprites
         randBg = random.randint(0, len(BACKGROUNDS_LIST) - 1)
-        IMAGES['background'] = pygame.image.load(BACKGROUNDS_LIST[randBg]).convert()
+        IMAGES['background'] = loadImage(BACKGROUNDS_LIST[randBg], alpha=False)
 
         # select random player sprites
         randPlayer = random.randint(0, len(PLAYERS_LIST) - 1)
         IMAGES['player'] = (
-            pygame.image.load(PLAYERS_LIST[randPlayer][0]).convert_alpha(),
-            pygame.image.load(PLAYERS_LIST[randPlayer][1]).convert_alpha(),
-            pygame.image.load(PLAYERS_LIST[randPlayer][2]).convert_alpha(),
+            loadImage(PLAYERS_LIST[randPlayer][0]),
+            loadImage(PLAYERS_LIST[randPlayer][1]),
+            loadImage(PLAYERS_LIST[randPlayer][2]),
         )
 
         # select random pipe sprites
         pipeindex = random.randint(0, len(PIPES_LIST) - 1)
         IMAGES['pipe'] = (
-            pygame.transform.flip(
-                pygame.image.load(PIPES_LIST[pipeindex]).convert_alpha(), False, True),
-            pygame.image.load(PIPES_LIST[pipeindex]).convert_alpha(),
+            loadImage(PIPES_LIST[pipeindex], flipped=True),
+            loadImage(PIPES_LIST[pipeindex]),
         )
 
         # hismask for pipes
         HITMASKS['pipe'] = (
-            getHitmask(IMAGES['pipe'][0]),
-            getHitmask(IMAGES['pipe'][1]),
+            loadHitmask(IMAGES['pipe'][0]),
+            loadHitmask(IMAGES['pipe'][1]),
         )
 
         # hitmask for player
         HITMASKS['player'] = (
-            getHitmask(IMAGES['player'][0]),
-            getHitmask(IMAGES['player'][1]),
-            getHitmask(IMAGES['player'][2]),
+            loadHitmask(IMAGES['player'][0]),
+            loadHitmask(IMAGES['player'][1]),
+            loadHitmask(IMAGES['player'][2]),
         )
 
+        # rotated player frames, so nothing is rotated while playing
+        for image in IMAGES['player']:
+            loadRotations(image)
+
         movementInfo = showWelcomeAnimation()
         crashInfo = mainGame(movementInfo)
         showGameOverScreen(crashInfo)
@@ -313,7 +317,7 @@ def mainGame(movementInfo):
         if playerRot <= playerRotThr:
             visibleRot = playerRot
         
-        playerSurface = pygame.transform.rotate(IMAGES['player'][playerIndex], visibleRot)
+        playerSurface = getRotated(IMAGES['player'][playerIndex], visibleRot)
         SCREEN.blit(playerSurface, (playerx, playery))
 
         pygame.display.update()
@@ -375,7 +379,7 @@ def showGameOverScreen(crashInfo):
         
 
 
-        playerSurface = pygame.transform.rotate(IMAGES['player'][1], playerRot)
+        playerSurface = getRotated(IMAGES['player'][1], playerRot)
         SCREEN.blit(playerSurface, (playerx,playery))
         SCREEN.blit(IMAGES['gameover'], (50, 180))
 
@@ -465,23 +469,51 @@ def pixelCollision(rect1, rect2, hitmask1, hitmask2):
     if rect.width == 0 or rect.height == 0:
         return False
 
-    x1, y1 = rect.x - rect1.x, rect.y - rect1.y
-    x2, y2 = rect.x - rect2.x, rect.y - rect2.y
-
-    for x in xrange(rect.width):
-        for y in xrange(rect.height):
-            if hitmask1[x1+x][y1+y] and hitmask2[x2+x][y2+y]:
-                return True
-    return False
+    # the masks are bit packed, so this ANDs whole words of pixels at a time
+    offset = (rect2.x - rect1.x, rect2.y - rect1.y)
+    return hitmask1.overlap(hitmask2, offset) is not None
+
+def loadImage(path, alpha=True, flipped=False):
+    """loads an image the first time it is asked for and returns the
+    same surface every time after that."""
+    key = (path, alpha, flipped)
+    if key not in IMAGE_CACHE:
+        if flipped:
+            image = pygame.transform.flip(loadImage(path, alpha), False, True)
+        elif alpha:
+            image = pygame.image.load(path).convert_alpha()
+        else:
+            image = pygame.image.load(path).convert()
+        IMAGE_CACHE[key] = image
+    return IMAGE_CACHE[key]
+
+def loadHitmask(image):
+    """returns the hitmask of an image, only built the first time."""
+    if image not in HITMASK_CACHE:
+        HITMASK_CACHE[image] = getHitmask(image)
+    return HITMASK_CACHE[image]
+
+def loadRotations(image):
+    """returns image rotated to every angle in ROTATION_RANGE, only
+    rendered the first time."""
+    if image not in ROTATION_CACHE:
+        ROTATION_CACHE[image] = dict(
+            (angle, pygame.transform.rotate(image, angle)) for angle in ROTATION_RANGE)
+    return ROTATION_CACHE[image]
+
+def getRotated(image, angle):
+    """returns image rotated by angle (rounded to a whole degree) from
+    the pre-rendered rotations."""
+    rotations = loadRotations(image)
+    angle = int(round(angle))
+    if angle not in rotations:
+        rotations[angle] = pygame.transform.rotate(image, angle)
+    return rotations[angle]
 
 def getHitmask(image):
-    """returns a hitmask using an image's alpha."""
-    mask = []
-    for x in xrange(image.get_width()):
-        mask.append([])
-        for y in xrange(image.get_height()):
-            mask[x].append(bool(image.get_at((x,y))[3]))
-    return mask
+    """returns a hitmask using an image's alpha, any pixel that isn't
+    fully transparent is solid."""
+    return pygame.mask.from_surface(image, 0)
 
 if __name__ == '__main__':
     main()
@@ -1,10 +1,17 @@
-import pygame, math
+import pygame, math, os, sys
 from random import randint
-from time import sleep
+from time import sleep, perf_counter
+
+# python short.py --benchmark [minutes] plays that many minutes of frames
+# without a window or a frame limit and prints the cost of a frame
+benchmark = "--benchmark" in sys.argv
+if benchmark :
+    os.environ["SDL_VIDEODRIVER"] = "dummy"
 
 pygame.init()
 
 gravity = 1
+scrollSpeed = 7 # pixels the pipes move left each frame
 
 def setVariables() :
     global dead
@@ -25,10 +32,14 @@ def setVariables() :
 
 win = pygame.display.set_mode((800, 600))
 pygame.display.set_caption("Flappy Bird!")
-img = pygame.image.load('birdup.png')
-bg = pygame.image.load('birdupbg.png')
-pipe = pygame.image.load('birduppipe.png')
-ground = pygame.image.load('birdupground.png')
+# converted to the display's format, so they aren't converted again on every blit
+img = pygame.image.load('birdup.png').convert_alpha()
+bg = pygame.image.load('birdupbg.png').convert()
+pipe = pygame.image.load('birduppipe.png').convert_alpha()
+flippedPipe = pygame.transform.rotate(pipe, 180)
+pipeWidth = pipe.get_width()
+pipePool = [] # pipes that went off screen, reused by pipePair
+ground = pygame.image.load('birdupground.png').convert_alpha()
 font = pygame.font.SysFont('Comic Sans MS', 30)
 
 class Bird :
@@ -65,12 +76,13 @@ class Pipe() :
         self.len = len
 
     def update(self) :
-        if self.dir == "UP" :
-            win.blit(pipe, (self.x, 600-self.len))
-        else :
-            win.blit(pygame.transform.rotate(pipe, 180), (self.x, self.len-431))
+        if self.x < 800 :
+            if self.dir == "UP" :
+                win.blit(pipe, (self.x, 600-self.len))
+            else :
+                win.blit(flippedPipe, (self.x, self.len-431))
         if not dead :
-            self.x -= 7
+            self.x -= scrollSpeed
 
     def checkCollide(self) :
         if self.dir == "DOWN" :
@@ -82,10 +94,22 @@ class Pipe() :
                 if Bird.y + 45 > 600-self.len :
                     die()
 
+def newPipe(dir, x, len) :
+    if pipePool :
+        p = pipePool.pop()
+        p.__init__(dir, x, len)
+        return p
+    return Pipe(dir, x, len)
+
+def retirePipes() :
+    # pipes are added on the right, so the ones that left are at the front
+    while pipes and pipes[0].x + pipeWidth < 0 :
+        pipePool.append(pipes.pop(0))
+
 def pipePair() :
     r = randint(75, 350)
-    pipes.append(Pipe("DOWN", 900, r))
-    pipes.append(Pipe("UP", 900, 600-(r+125)))
+    pipes.append(newPipe("DOWN", 900, r))
+    pipes.append(newPipe("UP", 900, 600-(r+125)))
     global score
     score += 1
 
@@ -93,14 +117,26 @@ def animateGround() :
     win.blit(ground, ((runs%111)*-7, 500))
 
 def die() :
+    if benchmark :
+        return
     global dead
     dead = True
     run = False
 
 setVariables()
 
+if benchmark :
+    started = True
+    frames = 60 * 60 * (int(sys.argv[-1]) if sys.argv[-1].isdigit() else 30)
+    minuteTime = 0
+
 while run:
-    pygame.time.Clock().tick(60)
+    if benchmark :
+        if runs == frames :
+            break
+        frameStart = perf_counter()
+    else :
+        pygame.time.Clock().tick(60)
     for event in pygame.event.get() :
         if event.type == pygame.KEYDOWN :
             if event.key == pygame.K_ESCAPE :
@@ -116,9 +152,12 @@ while run:
     win.blit(bg, (0, 0))
     if runs % 45 == 0 and started :
         pipePair()
+    retirePipes()
     for p in pipes :
         p.update()
-        p.checkCollide()
+        # only pipes across the bird's x range can hit it
+        if p.x < Bird.x + 48 and Bird.x < p.x + pipeWidth :
+            p.checkCollide()
     Bird.update()
     win.blit(bird, (Bird.x,Bird.y))
     animateGround()
@@ -130,5 +169,11 @@ while run:
     pygame.display.update()
     if not dead:
         runs += 1
+    if benchmark :
+        minuteTime += perf_counter() - frameStart
+        if runs % 3600 == 0 :
+            print("minute %d: %.3f ms/frame, %d pipes, %d pooled" %
+                  (runs // 3600, minuteTime / 3600 * 1000, len(pipes), len(pipePool)))
+            minuteTime = 0
 
 pygame.quit()
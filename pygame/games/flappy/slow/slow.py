@@ -2,8 +2,11 @@
 
 """Flappy Bird, implemented using Pygame."""
 
+import argparse
 import math
 import os
+import random
+import time
 from random import randint
 from collections import deque
 
@@ -12,6 +15,8 @@ from pygame.locals import *
 
 
 FPS = 60
+STEP_MSEC = 1000.0 / FPS  # simulated milliseconds per step, independent of drawing
+MAX_STEPS_PER_FRAME = 5   # drop time rather than fall further behind
 ANIMATION_SPEED = 0.18  # pixels per millisecond
 WIN_WIDTH = 284 * 2     # BG image size: 284x512 px; tiled twice
 WIN_HEIGHT = 512
@@ -28,8 +33,12 @@ class Bird(pygame.sprite.Sprite):
     Attributes:
     x: The bird's X coordinate.
     y: The bird's Y coordinate.
+    prev_y: The bird's Y coordinate before the last update, to
+        interpolate between when drawing.
     msec_to_climb: The number of milliseconds left to climb, where a
         complete climb lasts Bird.CLIMB_DURATION milliseconds.
+    msec_alive: The number of simulated milliseconds the bird has been
+        flying, which drives the flapping animation.
 
     Constants:
     WIDTH: The width, in pixels, of the bird's image.
@@ -65,7 +74,9 @@ class Bird(pygame.sprite.Sprite):
         """
         super(Bird, self).__init__()
         self.x, self.y = x, y
+        self.prev_y = y
         self.msec_to_climb = msec_to_climb
+        self.msec_alive = 0
         self._img_wingup, self._img_wingdown = images
         self._mask_wingup = pygame.mask.from_surface(self._img_wingup)
         self._mask_wingdown = pygame.mask.from_surface(self._img_wingdown)
@@ -85,6 +96,8 @@ class Bird(pygame.sprite.Sprite):
         delta_frames: The number of frames elapsed since this method was
             last called.
         """
+        self.prev_y = self.y
+        self.msec_alive += frames_to_msec(delta_frames)
         if self.msec_to_climb > 0:
             frac_climb_done = 1 - self.msec_to_climb/Bird.CLIMB_DURATION
             self.y -= (Bird.CLIMB_SPEED * frames_to_msec(delta_frames) *
@@ -99,10 +112,10 @@ class Bird(pygame.sprite.Sprite):
 
         This will decide whether to return an image where the bird's
         visible wing is pointing upward or where it is pointing downward
-        based on pygame.time.get_ticks().  This will animate the flapping
-        bird, even though pygame doesn't support animated GIFs.
+        based on msec_alive.  This will animate the flapping bird, even
+        though pygame doesn't support animated GIFs.
         """
-        if pygame.time.get_ticks() % 500 >= 250:
+        if self.msec_alive % 500 >= 250:
             return self._img_wingup
         else:
             return self._img_wingdown
@@ -113,7 +126,7 @@ class Bird(pygame.sprite.Sprite):
 
         The bitmask excludes all pixels in self.image with a
         transparency greater than 127."""
-        if pygame.time.get_ticks() % 500 >= 250:
+        if self.msec_alive % 500 >= 250:
             return self._mask_wingup
         else:
             return self._mask_wingdown
@@ -123,6 +136,17 @@ class Bird(pygame.sprite.Sprite):
         """Get the bird's position, width, and height, as a pygame.Rect."""
         return Rect(self.x, self.y, Bird.WIDTH, Bird.HEIGHT)
 
+    def interpolated_rect(self, alpha):
+        """Get the Rect to draw the bird at, alpha of the way from its
+        position before the last update to its current one.
+
+        Arguments:
+        alpha: How far, from 0 to 1, the display is between the last
+            update and the next one.
+        """
+        y = self.prev_y + (self.y - self.prev_y) * alpha
+        return Rect(self.x, y, Bird.WIDTH, Bird.HEIGHT)
+
 
 class PipePair(pygame.sprite.Sprite):
     """Represents an obstacle.
@@ -134,8 +158,11 @@ class PipePair(pygame.sprite.Sprite):
     x: The PipePair's X position.  This is a float, to make movement
         smoother.  Note that there is no y attribute, as it will only
         ever be 0.
+    prev_x: The PipePair's X position before the last update, to
+        interpolate between when drawing.
     image: A pygame.Surface which can be blitted to the display surface
-        to display the PipePair.
+        to display the PipePair.  It is shared with every other PipePair
+        with the same gap, so it must not be drawn on.
     mask: A bitmask which excludes all pixels in self.image with a
         transparency greater than 127.  This can be used for collision
         detection.
@@ -157,6 +184,8 @@ class PipePair(pygame.sprite.Sprite):
     PIECE_HEIGHT = 32
     ADD_INTERVAL = 3000
 
+    _baked = {}  # (pipe_end_img, pipe_body_img) -> layouts, see bake
+
     def __init__(self, pipe_end_img, pipe_body_img):
         """Initialises a new random PipePair.
 
@@ -168,41 +197,76 @@ class PipePair(pygame.sprite.Sprite):
         pipe_body_img: The image to use to represent one horizontal slice
             of a pipe's body.
         """
-        self.x = float(WIN_WIDTH - 1)
+        self.layouts = PipePair.bake(pipe_end_img, pipe_body_img)
+        self.reset()
+
+    def reset(self):
+        """Turn this PipePair into a new random one at the right edge of
+        the window, so it can be reused instead of building another."""
+        self.x = self.prev_x = float(WIN_WIDTH - 1)
         self.score_counted = False
 
-        self.image = pygame.Surface((PipePair.WIDTH, WIN_HEIGHT), SRCALPHA)
-        self.image.convert()   # speeds up blitting
-        self.image.fill((0, 0, 0, 0))
+        total_pipe_body_pieces = len(self.layouts)
+        bottom_pieces = randint(1, total_pipe_body_pieces)
+        self.image, self.mask = self.layouts[bottom_pieces - 1]
+
+        # compensate for added end pieces
+        self.top_pieces = total_pipe_body_pieces - bottom_pieces + 1
+        self.bottom_pieces = bottom_pieces + 1
+
+    @classmethod
+    def bake(cls, pipe_end_img, pipe_body_img):
+        """Get the image and mask of every possible PipePair.
+
+        There are only as many different PipePairs as there are places
+        for the gap, so they are drawn once, the first time they are
+        needed, instead of every time a PipePair is added.
+
+        Arguments:
+        pipe_end_img: The image to use to represent a pipe's end piece.
+        pipe_body_img: The image to use to represent one horizontal slice
+            of a pipe's body.
+
+        Returns a list of (image, mask) tuples, the one at index i having
+        i + 1 body pieces in the bottom pipe.
+        """
+        key = (pipe_end_img, pipe_body_img)
+        if key in cls._baked:
+            return cls._baked[key]
+
         total_pipe_body_pieces = int(
             (WIN_HEIGHT -                  # fill window from top to bottom
              3 * Bird.HEIGHT -             # make room for bird to fit through
              3 * PipePair.PIECE_HEIGHT) /  # 2 end pieces + 1 body piece
             PipePair.PIECE_HEIGHT          # to get number of pipe pieces
         )
-        self.bottom_pieces = randint(1, total_pipe_body_pieces)
-        self.top_pieces = total_pipe_body_pieces - self.bottom_pieces
-
-        # bottom pipe
-        for i in range(1, self.bottom_pieces + 1):
-            piece_pos = (0, WIN_HEIGHT - i*PipePair.PIECE_HEIGHT)
-            self.image.blit(pipe_body_img, piece_pos)
-        bottom_pipe_end_y = WIN_HEIGHT - self.bottom_height_px
-        bottom_end_piece_pos = (0, bottom_pipe_end_y - PipePair.PIECE_HEIGHT)
-        self.image.blit(pipe_end_img, bottom_end_piece_pos)
-
-        # top pipe
-        for i in range(self.top_pieces):
-            self.image.blit(pipe_body_img, (0, i * PipePair.PIECE_HEIGHT))
-        top_pipe_end_y = self.top_height_px
-        self.image.blit(pipe_end_img, (0, top_pipe_end_y))
-
-        # compensate for added end pieces
-        self.top_pieces += 1
-        self.bottom_pieces += 1
-
-        # for collision detection
-        self.mask = pygame.mask.from_surface(self.image)
+        layouts = []
+        for bottom_pieces in range(1, total_pipe_body_pieces + 1):
+            top_pieces = total_pipe_body_pieces - bottom_pieces
+
+            image = pygame.Surface((PipePair.WIDTH, WIN_HEIGHT), SRCALPHA)
+            image.convert()   # speeds up blitting
+            image.fill((0, 0, 0, 0))
+
+            # bottom pipe
+            for i in range(1, bottom_pieces + 1):
+                piece_pos = (0, WIN_HEIGHT - i*PipePair.PIECE_HEIGHT)
+                image.blit(pipe_body_img, piece_pos)
+            bottom_pipe_end_y = WIN_HEIGHT - bottom_pieces*PipePair.PIECE_HEIGHT
+            bottom_end_piece_pos = (0, bottom_pipe_end_y - PipePair.PIECE_HEIGHT)
+            image.blit(pipe_end_img, bottom_end_piece_pos)
+
+            # top pipe
+            for i in range(top_pieces):
+                image.blit(pipe_body_img, (0, i * PipePair.PIECE_HEIGHT))
+            top_pipe_end_y = top_pieces * PipePair.PIECE_HEIGHT
+            image.blit(pipe_end_img, (0, top_pipe_end_y))
+
+            # for collision detection
+            layouts.append((image, pygame.mask.from_surface(image)))
+
+        cls._baked[key] = layouts
+        return layouts
 
     @property
     def top_height_px(self):
@@ -224,6 +288,17 @@ class PipePair(pygame.sprite.Sprite):
         """Get the Rect which contains this PipePair."""
         return Rect(self.x, 0, PipePair.WIDTH, PipePair.PIECE_HEIGHT)
 
+    def interpolated_rect(self, alpha):
+        """Get the Rect to draw this PipePair at, alpha of the way from
+        its position before the last update to its current one.
+
+        Arguments:
+        alpha: How far, from 0 to 1, the display is between the last
+            update and the next one.
+        """
+        x = self.prev_x + (self.x - self.prev_x) * alpha
+        return Rect(x, 0, PipePair.WIDTH, PipePair.PIECE_HEIGHT)
+
     def update(self, delta_frames=1):
         """Update the PipePair's position.
 
@@ -231,6 +306,7 @@ class PipePair(pygame.sprite.Sprite):
         delta_frames: The number of frames elapsed since this method was
             last called.
         """
+        self.prev_x = self.x
         self.x -= ANIMATION_SPEED * frames_to_msec(delta_frames)
 
     def collides_with(self, bird):
@@ -243,6 +319,111 @@ class PipePair(pygame.sprite.Sprite):
         return pygame.sprite.collide_mask(self, bird)
 
 
+class Game(object):
+    """Represents one game, simulated in fixed time steps.
+
+    Every call to step advances the game by exactly STEP_MSEC
+    milliseconds, however often (or whether at all) it is drawn, so the
+    game plays the same at any framerate and can run without a display.
+
+    Attributes:
+    bird: The Bird controlled by the player.
+    pipes: A deque of the PipePairs that have not left the screen yet.
+    spare_pipes: PipePairs that have left the screen, to be reset and
+        reused instead of building new ones.
+    score: The number of pipes the bird has passed.
+    steps: The number of steps simulated so far.
+    over: Whether the bird has crashed, ending the game.
+    """
+
+    def __init__(self, images):
+        """Initialise a new Game.
+
+        Arguments:
+        images: The dict of images returned by load_images.
+        """
+        self.images = images
+        # the bird stays in the same x position, so bird.x is a constant
+        # center bird on screen
+        self.bird = Bird(50, int(WIN_HEIGHT/2 - Bird.HEIGHT/2), 2,
+                         (images['bird-wingup'], images['bird-wingdown']))
+        self.pipes = deque()
+        self.spare_pipes = []
+        self.score = 0
+        self.steps = 0
+        self.over = False
+
+    def flap(self):
+        """Make the bird start a new climb at the next step."""
+        self.bird.msec_to_climb = Bird.CLIMB_DURATION
+
+    def step(self):
+        """Advance the game by one time step of STEP_MSEC milliseconds."""
+        # Counted in steps rather than with pygame.time.set_timer(), so
+        # pipe addition isn't messed up when paused or running headless.
+        if not self.steps % msec_to_frames(PipePair.ADD_INTERVAL):
+            if self.spare_pipes:
+                pp = self.spare_pipes.pop()
+                pp.reset()
+            else:
+                pp = PipePair(self.images['pipe-end'], self.images['pipe-body'])
+            self.pipes.append(pp)
+        self.steps += 1
+
+        # check for collisions
+        pipe_collision = any(p.collides_with(self.bird) for p in self.pipes)
+        if (pipe_collision or 0 >= self.bird.y or
+                self.bird.y >= WIN_HEIGHT - Bird.HEIGHT):
+            self.over = True
+            return
+
+        while self.pipes and not self.pipes[0].visible:
+            self.spare_pipes.append(self.pipes.popleft())
+
+        for p in self.pipes:
+            p.update()
+        self.bird.update()
+
+        for p in self.pipes:
+            if p.x + PipePair.WIDTH < self.bird.x and not p.score_counted:
+                self.score += 1
+                p.score_counted = True
+
+    def draw(self, surface, score_font, alpha=1.0):
+        """Draw the game, interpolated between the last two steps.
+
+        Arguments:
+        surface: The Surface to draw on.
+        score_font: The Font to render the score with.
+        alpha: How far, from 0 to 1, the display is between the last
+            step and the next one.
+        """
+        for x in (0, WIN_WIDTH / 2):
+            surface.blit(self.images['background'], (x, 0))
+
+        for p in self.pipes:
+            surface.blit(p.image, p.interpolated_rect(alpha))
+
+        surface.blit(self.bird.image, self.bird.interpolated_rect(alpha))
+
+        score_surface = score_font.render(str(self.score), True,
+                                          (255, 255, 255))
+        score_x = WIN_WIDTH/2 - score_surface.get_width()/2
+        surface.blit(score_surface, (score_x, PipePair.PIECE_HEIGHT))
+
+    def autopilot(self):
+        """Flap whenever the bird sinks too close to the bottom of the
+        next gap.  Used to play the game headless."""
+        gap_bottom = WIN_HEIGHT / 2 + Bird.HEIGHT
+        for p in self.pipes:
+            if p.x + PipePair.WIDTH >= self.bird.x:
+                gap_bottom = WIN_HEIGHT - p.bottom_height_px
+                break
+        if (self.bird.msec_to_climb <= 0 and
+                self.bird.y + Bird.HEIGHT >= gap_bottom - Bird.HEIGHT / 2):
+            self.flap()
+
+
 def load_images():
     """Load all images required by the game and return a dict of them.
 
@@ -307,6 +488,41 @@ def msec_to_frames(milliseconds, fps=FPS):
     return fps * milliseconds / 1000.0
 
 
+def run_headless(steps, seed=None):
+    """Play the game without drawing it, as fast as possible.
+
+    The autopilot plays, and a new game is started whenever it crashes,
+    until steps steps have been simulated.  Prints the scores and the
+    number of steps simulated per second.
+
+    Arguments:
+    steps: The number of steps to simulate.
+    seed: The seed for the pipe positions, to get the same games again.
+    """
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    pygame.init()
+    pygame.display.set_mode((1, 1))  # images can't be converted without one
+    images = load_images()
+    random.seed(seed)
+
+    scores = []
+    game = Game(images)
+    start = time.time()
+    for _ in range(steps):
+        if game.over:
+            scores.append(game.score)
+            game = Game(images)
+        game.autopilot()
+        game.step()
+    seconds = time.time() - start
+    scores.append(game.score)
+    pygame.quit()
+
+    print('%i steps in %.2fs (%.0f steps/s), %i games, scores: %s' %
+          (steps, seconds, steps / seconds, len(scores),
+           ' '.join(str(score) for score in scores)))
+
+
 def main():
     """The application's entry point.
 
@@ -323,24 +539,12 @@ def main():
     score_font = pygame.font.SysFont(None, 32, bold=True)  # default font
     images = load_images()
 
-    # the bird stays in the same x position, so bird.x is a constant
-    # center bird on screen
-    bird = Bird(50, int(WIN_HEIGHT/2 - Bird.HEIGHT/2), 2,
-                (images['bird-wingup'], images['bird-wingdown']))
+    game = Game(images)
 
-    pipes = deque()
-
-    frame_clock = 0  # this counter is only incremented if the game isn't paused
-    score = 0
+    accumulator = 0.0  # real milliseconds not simulated yet
     done = paused = False
-    while not done:
-        clock.tick(FPS)
-
-        # Handle this 'manually'.  If we used pygame.time.set_timer(),
-        # pipe addition would be messed up when paused.
-        if not (paused or frame_clock % msec_to_frames(PipePair.ADD_INTERVAL)):
-            pp = PipePair(images['pipe-end'], images['pipe-body'])
-            pipes.append(pp)
+    while not (done or game.over):
+        accumulator += clock.tick(FPS)
 
         for e in pygame.event.get():
             if e.type == QUIT or (e.type == KEYUP and e.key == K_ESCAPE):
@@ -350,41 +554,26 @@ def main():
                 paused = not paused
             elif e.type == MOUSEBUTTONUP or (e.type == KEYUP and
                     e.key in (K_UP, K_RETURN, K_SPACE)):
-                bird.msec_to_climb = Bird.CLIMB_DURATION
+                game.flap()
 
         if paused:
+            accumulator = 0.0
             continue  # don't draw anything
 
-        # check for collisions
-        pipe_collision = any(p.collides_with(bird) for p in pipes)
-        if pipe_collision or 0 >= bird.y or bird.y >= WIN_HEIGHT - Bird.HEIGHT:
-            done = True
-
-        for x in (0, WIN_WIDTH / 2):
-            display_surface.blit(images['background'], (x, 0))
-
-        while pipes and not pipes[0].visible:
-            pipes.popleft()
-
-        for p in pipes:
-            p.update()
-            display_surface.blit(p.image, p.rect)
-
-        bird.update()
-        display_surface.blit(bird.image, bird.rect)
-
-        # update and display score
-        for p in pipes:
-            if p.x + PipePair.WIDTH < bird.x and not p.score_counted:
-                score += 1
-                p.score_counted = True
-
-        score_surface = score_font.render(str(score), True, (255, 255, 255))
-        score_x = WIN_WIDTH/2 - score_surface.get_width()/2
-        display_surface.blit(score_surface, (score_x, PipePair.PIECE_HEIGHT))
+        # run as many steps as the time since the last frame is worth,
+        # which may be none if we are drawing faster than FPS
+        steps = 0
+        while accumulator >= STEP_MSEC and not game.over:
+            game.step()
+            accumulator -= STEP_MSEC
+            steps += 1
+            if steps == MAX_STEPS_PER_FRAME:
+                accumulator = 0.0
+                break
 
+        game.draw(display_surface, score_font, accumulator / STEP_MSEC)
         pygame.display.flip()
-        frame_clock += 1
+    score = game.score
     print('Game over! Score: %i' % score)
     pygame.quit()
 
@@ -392,4 +581,14 @@ def main():
 if __name__ == '__main__':
     # If this module had been imported, __name__ would be 'flappybird'.
     # It was executed (e.g. by double-clicking the file), so call main.
-    main()
+    parser = argparse.ArgumentParser(description='Flappy Bird, in Pygame.')
+    parser.add_argument('--headless', type=int, metavar='STEPS',
+                        help='let the autopilot play STEPS steps without '
+                             'a display and report the speed')
+    parser.add_argument('--seed', type=int, help='seed for the pipes')
+    args = parser.parse_args()
+    if args.headless:
+        run_headless(args.headless, args.seed)
+    else:
+        random.seed(args.seed)
+        main()